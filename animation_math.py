@@ -0,0 +1,244 @@
+"""
+Vectorized animation math for the Blender MCP server
+Pure NumPy (no bpy), so trajectories for many objects are computed in one
+pass and handed to the server's bulk F-curve writer.
+
+Usage: python animation_math.py --benchmark [--samples 100000] [--tolerance 0.001]
+Times curve simplification on a dense noisy path and checks its error bound.
+
+NumPy is not a dependency of the client project; it ships with Blender.
+Run the benchmark with Blender's Python, e.g.
+<blender>/<version>/python/bin/python3.11 animation_math.py --benchmark
+"""
+import sys
+import time
+
+import numpy as np
+
+
+def bounce_trajectory(heights, floors, times, gravity=9.81, restitution=0.7, min_height=0.01):
+    """Heights and vertical speeds of balls dropped from rest onto a floor
+
+    Each ball falls from its height, and every impact keeps `restitution`
+    of its speed, so flight k lasts 2 * v1 * e^k / g. The bounce a sample
+    falls in is found in closed form (a geometric series) rather than by
+    stepping a simulation. Once a bounce would peak below min_height, the
+    ball rests on the floor.
+
+    Args:
+        heights: Array (n,) of starting center heights
+        floors: Array (n,) of center heights at contact
+        times: Array (m,) of seconds since the drop
+        gravity: Downward acceleration in units/s^2
+        restitution: Fraction of speed kept at each impact (0-1)
+        min_height: Bounces lower than this end the motion
+
+    Returns:
+        (y, vy, since_impact, until_impact, impact_speed) arrays of shape (n, m):
+        height, vertical velocity, seconds since the last impact and until
+        the next one (inf when there is none), and the speed of the nearest
+        impact
+    """
+    heights = np.asarray(heights, dtype=np.float64)[:, None]
+    floors = np.asarray(floors, dtype=np.float64)[:, None]
+    t = np.asarray(times, dtype=np.float64)[None, :]
+    e = float(np.clip(restitution, 0.0, 0.999))
+    g = float(gravity)
+    log_e = np.log(max(e, 1e-12))
+
+    drop = np.maximum(heights - floors, 0.0)
+    v1 = np.sqrt(2 * g * drop)  # Speed at the first impact
+    tau = t - np.sqrt(2 * drop / g)  # Seconds since the first impact
+
+    # Bounce j peaks at e^2j * drop; the ball settles after the last one
+    # that still clears min_height
+    last = np.floor(np.log(min_height / np.maximum(drop, min_height)) / (2 * log_e))
+    last = np.where((drop > min_height) & (e > 0), last, 0)
+
+    # Impact k happens S_k = unit * (1 - e^k) after the first one, so the
+    # number of finished bounces at tau is floor(log(1 - tau / unit) / log e)
+    unit = 2 * v1 * e / (g * (1 - e))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(unit > 0, tau / unit, np.inf)
+        done = np.where(ratio < 1, np.floor(np.log1p(-np.minimum(ratio, 1 - 1e-12)) / log_e), np.inf)
+    done = np.clip(done, 0, last)
+
+    falling = tau < 0
+    resting = ~falling & ((ratio >= 1) | (done >= last))
+
+    impact = unit * (1 - e ** done)  # Start of the current flight (or of the rest)
+    launch = np.where(resting, 0.0, v1 * e ** (done + 1))
+    airtime = 2 * launch / g
+    s = tau - impact
+
+    y = np.where(falling, heights - g * t ** 2 / 2, floors + launch * s - g * s ** 2 / 2)
+    vy = np.where(falling, -g * t, launch - g * s)
+    since = np.where(falling, np.inf, s)
+    until = np.where(falling, -tau, np.where(resting, np.inf, airtime - s))
+
+    # Speed of the nearer impact: the one that started this flight or the one ending it
+    impact_speed = np.where(~resting & (s > airtime / 2), launch, v1 * e ** done)
+    impact_speed = np.where(falling, v1, impact_speed)
+
+    y = np.where(resting, floors, y)
+    vy = np.where(resting, 0.0, vy)
+    return y, vy, since, until, impact_speed
+
+
+def squash_stretch(vy, since_impact, until_impact, impact_speed, reference_speed, frame_time,
+                   squash=0.3, stretch=0.15):
+    """Area-preserving (x, y) scale factors for a bouncing ball
+
+    In flight the ball stretches along its motion in proportion to its
+    speed; within half a frame of an impact it squashes in proportion to
+    the impact speed.
+
+    Args:
+        vy, since_impact, until_impact, impact_speed: Output of bounce_trajectory
+        reference_speed: Array (n,) of speeds that give the full effect
+        frame_time: Seconds per sample, to decide which samples touch the floor
+        squash: Height lost at the hardest impact (0-1)
+        stretch: Height gained at full speed
+
+    Returns:
+        (sx, sy) arrays of shape (n, m)
+    """
+    reference = np.maximum(np.asarray(reference_speed, dtype=np.float64)[:, None], 1e-9)
+    sy = 1 + stretch * np.clip(np.abs(vy) / reference, 0, 1)
+    contact = np.minimum(since_impact, until_impact) < frame_time / 2
+    squashed = 1 - squash * np.clip(impact_speed / reference, 0, 1)
+    sy = np.where(contact, np.maximum(squashed, 0.05), sy)
+    return 1 / sy, sy
+
+
+# ========== CURVE SIMPLIFICATION ==========
+# Ramer-Douglas-Peucker: keep the sample farthest from the chord between two
+# kept samples while it is farther than the tolerance, recursively. Every
+# dropped sample ends up within tolerance of the simplified curve. All open
+# spans are split in the same pass with whole-array operations, so the cost
+# is a few NumPy calls per recursion level rather than per span.
+
+def _rdp(count, deviation, tolerance, chunk=1024):
+    """Indices kept by Ramer-Douglas-Peucker
+
+    Args:
+        count: Number of samples
+        deviation: Callable(i, a, b) returning the distance of each sample
+            i[k] from the chord between samples a[k] and b[k]
+        tolerance: Largest allowed distance
+        chunk: Every chunk-th sample is kept up front. Periodic input (a
+            bouncing path has many equally far peaks) otherwise peels off
+            one period per level, making the passes quadratic; this bounds
+            the depth for the cost of count / chunk extra samples.
+    """
+    keep = np.zeros(count, dtype=bool)
+    keep[::chunk] = True
+    keep[-1] = True
+    pending = ~keep  # Samples in spans not yet known to be within tolerance
+    while pending.any():
+        kept = np.flatnonzero(keep)
+        samples = np.flatnonzero(pending)
+        span = np.searchsorted(kept, samples) - 1
+        distances = deviation(samples, kept[span], kept[span + 1])
+
+        # Farthest sample of each span (samples are sorted, so spans are contiguous)
+        starts = np.flatnonzero(np.r_[True, span[1:] != span[:-1]])
+        group = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(samples)]))
+        worst = np.maximum.reduceat(distances, starts)
+        farthest = (distances == worst[group]) & (worst[group] > tolerance)
+        _, first = np.unique(group[farthest], return_index=True)
+        splits = samples[farthest][first]
+
+        keep[splits] = True
+        pending[splits] = False
+        pending[samples[worst[group] <= tolerance]] = False
+    return np.flatnonzero(keep)
+
+
+def simplify_keyframes(frames, values, tolerance):
+    """Drop keyframes that linear interpolation of the rest reproduces within tolerance
+
+    Args:
+        frames: Array (n,) of increasing frame numbers
+        values: Array (n, channels) of key values
+        tolerance: Largest allowed value error on any channel
+
+    Returns:
+        Indices of the keys to keep (always including the first and last)
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64).reshape(len(frames), -1)
+    if len(frames) < 3 or tolerance <= 0:
+        return np.arange(len(frames))
+
+    def deviation(i, a, b):
+        weight = ((frames[i] - frames[a]) / (frames[b] - frames[a]))[:, None]
+        line = values[a] + weight * (values[b] - values[a])
+        return np.abs(values[i] - line).max(axis=1)
+
+    return _rdp(len(frames), deviation, tolerance)
+
+
+def simplify_polyline(points, tolerance):
+    """Drop polyline points lying within tolerance of the simplified line
+
+    Args:
+        points: Array (n, dims) of coordinates
+        tolerance: Largest allowed distance from a dropped point to the
+            segment replacing it
+
+    Returns:
+        Indices of the points to keep (always including both ends)
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if len(points) < 3 or tolerance <= 0:
+        return np.arange(len(points))
+
+    def deviation(i, a, b):
+        segment = points[b] - points[a]
+        offsets = points[i] - points[a]
+        length = np.einsum("ij,ij->i", segment, segment)
+        along = np.einsum("ij,ij->i", offsets, segment) / np.where(length > 0, length, 1)
+        along = np.clip(along, 0, 1)[:, None]
+        return np.linalg.norm(offsets - along * segment, axis=1)
+
+    return _rdp(len(points), deviation, tolerance)
+
+
+def benchmark(samples, tolerance):
+    """Simplify a dense noisy motion path and a stroke, reporting size, time and error"""
+    rng = np.random.default_rng(0)
+    frames = np.arange(1, samples + 1, dtype=np.float64)
+    t = frames / 240
+    path = np.column_stack((t, np.abs(np.sin(t * 3)) * 3, np.zeros_like(t)))
+    path += rng.normal(0, tolerance / 4, path.shape)
+
+    print(f"✂️  {samples} samples, tolerance {tolerance}")
+    print(f"{'input':>10} {'kept':>8} {'ratio':>7} {'ms':>9} {'max error':>10}")
+    for label, simplify in (("keyframes", lambda: simplify_keyframes(frames, path, tolerance)),
+                            ("stroke", lambda: simplify_polyline(path, tolerance))):
+        start = time.perf_counter()
+        kept = simplify()
+        elapsed = (time.perf_counter() - start) * 1000
+        # Worst deviation of any input sample from the simplified curve
+        span = np.clip(np.searchsorted(kept, np.arange(samples), side="right") - 1, 0, len(kept) - 2)
+        i, a, b = np.arange(samples), kept[span], kept[span + 1]
+        if label == "keyframes":
+            weight = ((frames[i] - frames[a]) / (frames[b] - frames[a]))[:, None]
+            error = np.abs(path[i] - (path[a] + weight * (path[b] - path[a]))).max()
+        else:
+            segment, offsets = path[b] - path[a], path[i] - path[a]
+            along = np.clip(np.einsum("ij,ij->i", offsets, segment) / np.einsum("ij,ij->i", segment, segment), 0, 1)
+            error = np.linalg.norm(offsets - along[:, None] * segment, axis=1).max()
+        print(f"{label:>10} {len(kept):>8} {samples / len(kept):>6.0f}x {elapsed:>9.1f} {error:>10.5f}")
+
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        options = {"--samples": "100000", "--tolerance": "0.001"}
+        for i, arg in enumerate(sys.argv[:-1]):
+            if arg in options:
+                options[arg] = sys.argv[i + 1]
+        benchmark(int(options["--samples"]), float(options["--tolerance"]))
+    else:
+        print(__doc__)
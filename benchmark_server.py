@@ -0,0 +1,84 @@
+"""
+Benchmark Blender MCP server tools inside Blender
+Usage: blender --background --factory-startup --python benchmark_server.py -- [--objects 10000] [--keys 10000] [--ops]
+
+--objects  Number of objects to create while measuring per-call cost
+--keys     Number of location keyframes to import onto one object
+--ops      Also measure the old bpy.ops / frame_set paths for comparison
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import bpy
+import blender_mcp_server as server
+
+
+def parse_args():
+    """Read options passed after Blender's '--' separator"""
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    options = {"objects": 10000, "keys": 10000, "ops": False}
+    for i, arg in enumerate(argv):
+        if arg == "--objects":
+            options["objects"] = int(argv[i + 1])
+        elif arg == "--keys":
+            options["keys"] = int(argv[i + 1])
+        elif arg == "--ops":
+            options["ops"] = True
+    return options
+
+
+def bench_creation(label, create, total, sample=500):
+    """Print the average cost of one creation call as the scene grows"""
+    server.clear_scene()
+    print(f"\n📦 {label}")
+    print(f"{'objects':>10} {'us/call':>10}")
+
+    created = 0
+    while created < total:
+        start = time.perf_counter()
+        for i in range(sample):
+            create(created + i)
+        per_call = (time.perf_counter() - start) / sample * 1e6
+        created += sample
+        print(f"{created:>10} {per_call:>10.1f}")
+
+
+def create_with_data_api(i):
+    server.create_2d_circle(name=f"Ball{i}", radius=0.5, location=[i % 100, i // 100, 0])
+
+
+def create_with_ops(i):
+    bpy.ops.mesh.primitive_circle_add(radius=0.5, location=(i % 100, i // 100, 0), fill_type='NGON')
+    bpy.context.active_object.name = f"Ball{i}"
+
+
+def bench_keyframes(count, compare_ops):
+    """Time importing a dense motion path onto a single object"""
+    server.create_2d_circle(name="Path", radius=0.5)
+    keyframes = [[frame, frame * 0.01, (frame % 48) * 0.1, 0.0] for frame in range(1, count + 1)]
+
+    print(f"\n🎞️  {count} location keyframes")
+    start = time.perf_counter()
+    server.animate_object_location("Path", keyframes)
+    print(f"   bulk F-curve write: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    if compare_ops:
+        obj = bpy.data.objects["Path"]
+        obj.animation_data_clear()
+        start = time.perf_counter()
+        for frame, x, y, z in keyframes:
+            bpy.context.scene.frame_set(frame)
+            obj.location = (x, y, z)
+            obj.keyframe_insert(data_path="location", frame=frame)
+        print(f"   frame_set + keyframe_insert: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    options = parse_args()
+    bench_creation("create_2d_circle (bpy.data)", create_with_data_api, options["objects"])
+    if options["ops"]:
+        bench_creation("primitive_circle_add (bpy.ops)", create_with_ops, options["objects"])
+    bench_keyframes(options["keys"], options["ops"])
@@ -1,42 +1,482 @@
+"""
+Launch the Blender MCP server for an MCP client over stdio
+
+Usage:
+  python blender_mcp_launcher.py                  Start a fresh Blender for this client
+  python blender_mcp_launcher.py --pool           Lease a warm Blender from the pool daemon
+                                                  (falls back to a fresh Blender if none is running)
+  python blender_mcp_launcher.py --pool-daemon [--size 2]
+                                                  Keep a pool of pre-started Blender servers
+  python blender_mcp_launcher.py --serve streamable-http|sse [--port 8000]
+                                                  Run one Blender serving many clients over HTTP,
+                                                  each in its own scene (agents set BLENDER_MCP_URL)
+  python blender_mcp_launcher.py --benchmark [--messages 2000] [--size 65536]
+                                                  Measure the stdout filter's throughput and latency
+
+--port selects the pool daemon port (default 8765) in both pool modes.
+--metrics PATH|stderr [--metrics-sample 0.1] makes Blender record per-tool
+timings to a JSON-lines file, or to this launcher's stderr.
+"""
+import asyncio
 import subprocess
+import socket
 import sys
 import os
 import json
+import threading
+import time
 
 BLENDER_EXE = r"C:\Program Files\Blender Foundation\Blender 5.0\blender.exe"
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "blender_mcp_server.py")
+
+POOL_HOST = "127.0.0.1"
+POOL_PORT = 8765
+HEALTH_TIMEOUT = 5.0        # Seconds a worker has to answer a ping
+HEALTH_INTERVAL = 30.0      # Seconds between idle worker health checks
+LEASE_TIMEOUT = 120.0       # Seconds a client waits for a free worker
+RESET_TIMEOUT = 120.0       # Seconds a released worker has to reset and reconnect
+
+# JSON-RPC ping used to check a worker before handing it out
+HEALTH_PING = b'{"jsonrpc": "2.0", "id": "pool-health", "method": "ping"}\n'
+
+
+def option(name, default):
+    """Value following a command-line flag"""
+    if name in sys.argv[:-1]:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+
+def blender_args(*server_args):
+    """Command line that starts Blender running the MCP server"""
+    args = [
+        BLENDER_EXE,
+        "--background",
+        "--factory-startup",
+        "--log-level", "0",
+        "--python",
+        SERVER_SCRIPT,
+    ]
+    if server_args:
+        args += ["--", *server_args]
+    return args
+
+
+def blender_env():
+    """Environment for Blender, carrying the --metrics settings"""
+    env = dict(os.environ)
+    target = option("--metrics", None)
+    if target:
+        env["BLENDER_MCP_METRICS"] = target
+        env["BLENDER_MCP_METRICS_SAMPLE"] = option("--metrics-sample", "1")
+    return env
+
+
+def blender_stderr():
+    """Blender's stderr is only kept when metrics are routed through it"""
+    return subprocess.PIPE if option("--metrics", None) == "stderr" else subprocess.DEVNULL
+
+
+def relay_metrics(src, dst):
+    """Forward metric records from Blender's stderr, dropping its other output"""
+    for line in src:
+        if line.startswith(b'{"mcp_metric"'):
+            dst.write(line)
+            dst.flush()
+
+
+def start_metrics_relay(process):
+    if process.stderr is not None:
+        threading.Thread(target=relay_metrics, args=(process.stderr, sys.stderr.buffer), daemon=True).start()
+
+
+RELAY_CHUNK = 1 << 20
+
+
+def is_jsonrpc_line(line):
+    """Cheap check whether a stripped stdout line is a JSON-RPC message
+
+    MCP serializes "jsonrpc" as the first key, so real messages are
+    recognized by their prefix; only other brace-delimited lines (which
+    could still be JSON) pay for a full parse.
+    """
+    if not line.startswith(b"{") or not line.endswith(b"}"):
+        return False
+    if line.startswith(b'{"jsonrpc":'):
+        return True
+    try:
+        json.loads(line)
+        return True
+    except ValueError:
+        return False
+
+
+def relay_jsonrpc(src, dst):
+    """Forward JSON-RPC lines from src to dst (binary streams), dropping everything else"""
+    partial = []
+    while chunk := src.read1(RELAY_CHUNK):
+        head, newline, rest = chunk.partition(b"\n")
+        if not newline:
+            # Large message still arriving; join once it is complete
+            partial.append(chunk)
+            continue
+
+        partial.append(head)
+        lines = rest.split(b"\n")
+        lines[0:0] = [b"".join(partial)]
+        partial = [lines.pop()]
+
+        forwarded = [line.strip() for line in lines]
+        forwarded = [line + b"\n" for line in forwarded if is_jsonrpc_line(line)]
+        if forwarded:
+            dst.write(b"".join(forwarded))
+            dst.flush()
+
+    last = b"".join(partial).strip()
+    if is_jsonrpc_line(last):
+        dst.write(last + b"\n")
+        dst.flush()
+
+
+def run_direct():
+    """Start Blender for this client and forward only its JSON-RPC output"""
+    # stdin is inherited, so client requests reach Blender without a relay hop
+    process = subprocess.Popen(
+        blender_args(),
+        stdout=subprocess.PIPE,
+        stderr=blender_stderr(),  # Discard Blender's stderr unless it carries metrics
+        env=blender_env(),
+        bufsize=RELAY_CHUNK,
+    )
+    start_metrics_relay(process)
+
+    # Filter and forward only JSON-RPC messages (skips Blender startup output)
+    try:
+        relay_jsonrpc(process.stdout, sys.stdout.buffer)
+    except KeyboardInterrupt:
+        process.terminate()
+
+    process.wait()
+    return process.returncode
+
+
+# ========== WARM POOL CLIENT ==========
+
+def run_pool_client(port):
+    """Relay this client's stdio to a warm Blender leased from the pool daemon
+
+    Returns:
+        Exit code, or None if no daemon could provide a worker
+    """
+    try:
+        sock = socket.create_connection((POOL_HOST, port))
+    except OSError:
+        return None
+
+    with sock:
+        sock.sendall(b"CLIENT\n")
+        reply = sock.makefile("rb").readline()
+        if reply.strip() != b"OK":
+            return None
+
+        def forward_stdin():
+            stdin = sys.stdin.buffer
+            try:
+                while data := stdin.read1(65536):
+                    sock.sendall(data)
+            except OSError:
+                pass
+            finally:
+                try:
+                    sock.shutdown(socket.SHUT_WR)
+                except OSError:
+                    pass
+
+        threading.Thread(target=forward_stdin, daemon=True).start()
+
+        stdout = sys.stdout.buffer
+        try:
+            while data := sock.recv(65536):
+                stdout.write(data)
+                stdout.flush()
+        except (OSError, KeyboardInterrupt):
+            pass
+    return 0
+
+
+# ========== WARM POOL DAEMON ==========
 
-args = [
-    BLENDER_EXE,
-    "--background",
-    "--factory-startup",
-    "--log-level", "0",
-    "--python",
-    "blender_mcp_server.py",
-]
-
-# Start Blender process
-process = subprocess.Popen(
-    args,
-    stdout=subprocess.PIPE,
-    stderr=subprocess.DEVNULL,  # Discard Blender's stderr
-    text=True,
-    bufsize=1,
-)
-
-# Filter and forward only JSON-RPC messages
-try:
-    for line in process.stdout:
+class PoolWorker:
+    """Connection to one pre-started Blender server waiting for a client"""
+
+    def __init__(self, pid, reader, writer):
+        self.pid = pid
+        self.reader = reader
+        self.writer = writer
+
+
+class WarmPool:
+    """Keeps pre-started Blender servers ready and leases one per MCP client
+
+    Workers connect back to the daemon and serve MCP over that connection.
+    After a client disconnects the worker resets to factory settings and
+    reconnects, so every lease starts from a clean scene without paying
+    Blender's startup cost.
+    """
+
+    def __init__(self, size, port):
+        self.size = size
+        self.port = port
+        self.idle = asyncio.Queue()
+        self.processes = {}
+        self.released = {}
+        self.lease_times = []
+        self.recycled = 0
+
+    async def serve(self):
+        server = await asyncio.start_server(self._on_connect, POOL_HOST, self.port)
+        for _ in range(self.size):
+            self._spawn()
+        asyncio.get_running_loop().create_task(self._health_loop())
+
+        print(f"🔥 Warm Blender pool: {self.size} workers on {POOL_HOST}:{self.port}", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for process in self.processes.values():
+                process.kill()
+
+    def _spawn(self):
+        process = subprocess.Popen(
+            blender_args("--pool-worker", f"{POOL_HOST}:{self.port}"),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=blender_stderr(),
+            env=blender_env(),
+        )
+        start_metrics_relay(process)
+        self.processes[process.pid] = process
+
+    def _recycle(self, pid):
+        """Kill a worker that failed its health check and start a replacement"""
+        process = self.processes.pop(pid, None)
+        self.released.pop(pid, None)
+        if process is None:
+            return  # Already replaced
+        if process.poll() is None:
+            process.kill()
+        self.recycled += 1
+        self._spawn()
+
+    async def _healthy(self, worker):
+        """Ping an idle worker and wait for its answer"""
+        process = self.processes.get(worker.pid)
+        if process is None or process.poll() is not None:
+            return False
+        try:
+            worker.writer.write(HEALTH_PING)
+            await worker.writer.drain()
+            reply = await asyncio.wait_for(worker.reader.readline(), HEALTH_TIMEOUT)
+        except (OSError, asyncio.TimeoutError):
+            return False
+        return b'"pool-health"' in reply
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(HEALTH_INTERVAL)
+
+            # Check every idle worker, recycling the ones that don't answer
+            for _ in range(self.idle.qsize()):
+                worker = self.idle.get_nowait()
+                if await self._healthy(worker):
+                    self.idle.put_nowait(worker)
+                else:
+                    worker.writer.close()
+                    self._recycle(worker.pid)
+
+            # Replace workers that crashed or never came back from a lease
+            now = time.monotonic()
+            for pid, process in list(self.processes.items()):
+                released_at = self.released.get(pid)
+                if process.poll() is not None or (released_at and now - released_at > RESET_TIMEOUT):
+                    self._recycle(pid)
+
+    async def _on_connect(self, reader, writer):
+        hello = (await reader.readline()).split()
+        if hello[:1] == [b"WORKER"] and len(hello) == 2:
+            pid = int(hello[1])
+            self.released.pop(pid, None)
+            self.idle.put_nowait(PoolWorker(pid, reader, writer))
+        elif hello == [b"CLIENT"]:
+            await self._lease(reader, writer)
+        else:
+            writer.close()
+
+    async def _lease(self, reader, writer):
+        """Hand a healthy worker to a client and relay until either side closes"""
+        started = time.monotonic()
+        try:
+            while True:
+                worker = await asyncio.wait_for(self.idle.get(), LEASE_TIMEOUT)
+                if await self._healthy(worker):
+                    break
+                worker.writer.close()
+                self._recycle(worker.pid)
+        except asyncio.TimeoutError:
+            writer.close()
+            return
+
+        latency = time.monotonic() - started
+        self.lease_times.append(latency)
+        self._report_lease(latency)
+
+        writer.write(b"OK\n")
+        await writer.drain()
+
+        async def pipe(src, dst):
+            try:
+                while data := await src.read(65536):
+                    dst.write(data)
+                    await dst.drain()
+            except OSError:
+                pass
+
+        to_worker = asyncio.ensure_future(pipe(reader, worker.writer))
+        to_client = asyncio.ensure_future(pipe(worker.reader, writer))
+        done, _ = await asyncio.wait([to_worker, to_client], return_when=asyncio.FIRST_COMPLETED)
+        if to_worker in done and not to_client.done():
+            # The client is done sending; let the worker answer what it
+            # already received, then it closes its side
+            if worker.writer.can_write_eof():
+                worker.writer.write_eof()
+            await asyncio.wait([to_client], timeout=RESET_TIMEOUT)
+        to_worker.cancel()
+        to_client.cancel()
+
+        # Closing the worker's connection ends its MCP session; it resets
+        # its scene and reconnects as idle
+        writer.close()
+        worker.writer.close()
+        self.released[worker.pid] = time.monotonic()
+
+    def _report_lease(self, latency):
+        times = sorted(self.lease_times)
+        p50 = times[len(times) // 2]
+        print(
+            f"📊 lease #{len(times)}: {latency * 1000:.1f} ms "
+            f"(p50 {p50 * 1000:.1f} ms, max {times[-1] * 1000:.1f} ms) | "
+            f"idle {self.idle.qsize()}/{self.size} | recycled {self.recycled}",
+            flush=True,
+        )
+
+
+# ========== RELAY BENCHMARK ==========
+
+# Writes JSON-RPC messages stamped with their send time, mixed with log noise
+BENCH_PRODUCER = """
+import sys, time
+count, size, pace = int(sys.argv[1]), int(sys.argv[2]), float(sys.argv[3])
+out = sys.stdout.buffer
+payload = b"x" * size
+for i in range(count):
+    if i % 10 == 0:
+        out.write(b"Fra:1 Mem:12.00M (Peak 12.00M) | Time:00:00.01 | Syncing Ball\\n")
+    out.write(b'{"jsonrpc":"2.0","id":%d,"result":{"sent":%.9f,"data":"%s"}}\\n' % (i, time.perf_counter(), payload))
+    out.flush()
+    if pace:
+        time.sleep(pace)
+"""
+
+
+def relay_legacy(src, dst):
+    """The original text-mode filter, kept for comparison"""
+    for line in src:
         line = line.strip()
         if line:
-            # Try to parse as JSON - only forward valid JSON
             try:
                 json.loads(line)
-                print(line, flush=True)
+                print(line, file=dst, flush=True)
             except json.JSONDecodeError:
-                # Skip non-JSON lines (Blender startup messages)
                 pass
-except KeyboardInterrupt:
-    process.terminate()
 
-process.wait()
-sys.exit(process.returncode)
+
+def bench_relay(relay, count, size, pace=0.0):
+    """Relay a producer's output into a pipe and time what arrives at the other end
+
+    Returns:
+        (MB/s, median latency in ms)
+    """
+    import io
+    import statistics
+
+    producer = subprocess.Popen(
+        [sys.executable, "-c", BENCH_PRODUCER, str(count), str(size), str(pace)],
+        stdout=subprocess.PIPE,
+        bufsize=RELAY_CHUNK,
+    )
+    read_fd, write_fd = os.pipe()
+    latencies = []
+    received = [0]
+
+    def consume():
+        with open(read_fd, "rb") as pipe:
+            for line in pipe:
+                arrived = time.perf_counter()
+                start = line.index(b'"sent":') + 7
+                latencies.append(arrived - float(line[start:line.index(b",", start)]))
+                received[0] += len(line)
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    started = time.perf_counter()
+    with open(write_fd, "wb") as dst:
+        if relay is relay_legacy:
+            src = io.TextIOWrapper(producer.stdout, encoding="utf-8")
+            relay(src, io.TextIOWrapper(dst, encoding="utf-8"))
+        else:
+            relay(producer.stdout, dst)
+    consumer.join()
+    elapsed = time.perf_counter() - started
+    producer.wait()
+
+    return received[0] / elapsed / 1e6, statistics.median(latencies) * 1000
+
+
+def benchmark(count, size):
+    print(f"📨 {count} messages of {size} bytes (+10% non-JSON noise)")
+    print(f"{'filter':>8} {'MB/s':>9} {'latency ms':>11}")
+    for name, relay in (("legacy", relay_legacy), ("fast", relay_jsonrpc)):
+        throughput, _ = bench_relay(relay, count, size)
+        # Latency is measured with paced messages so queueing doesn't hide it
+        _, latency = bench_relay(relay, min(count, 200), size, pace=0.002)
+        print(f"{name:>8} {throughput:>9.1f} {latency:>11.3f}")
+
+
+if __name__ == "__main__":
+    port = int(option("--port", POOL_PORT))
+
+    if "--benchmark" in sys.argv:
+        benchmark(int(option("--messages", 2000)), int(option("--size", 65536)))
+        sys.exit(0)
+
+    if "--serve" in sys.argv:
+        server_args = ["--transport", option("--serve", "streamable-http"), "--port", option("--port", "8000")]
+        try:
+            sys.exit(subprocess.call(blender_args(*server_args), env=blender_env()))
+        except KeyboardInterrupt:
+            sys.exit(0)
+
+    if "--pool-daemon" in sys.argv:
+        try:
+            asyncio.run(WarmPool(int(option("--size", 2)), port).serve())
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+
+    returncode = None
+    if "--pool" in sys.argv:
+        returncode = run_pool_client(port)
+    if returncode is None:
+        returncode = run_direct()
+    sys.exit(returncode)
@@ -1,6 +1,21 @@
 import sys
 import site
 import os
+import json
+import inspect
+import tempfile
+import asyncio
+import contextlib
+import functools
+import hashlib
+import io
+import itertools
+import random
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from concurrent.futures import Future
 
 # Add user site-packages to path so Blender can find mcp
 user_site = site.getusersitepackages()
@@ -35,101 +50,752 @@ if os.path.exists(pywin32_dll_dir):
     except Exception:
         pass  # If preloading fails, continue anyway
 
+import math
+
 import bpy
-from mcp.server.fastmcp import FastMCP
+import numpy as np
+from mcp.server.fastmcp import Context, FastMCP, Image
+
+# Helper modules live next to this script
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from animation_math import bounce_trajectory, simplify_keyframes, simplify_polyline, squash_stretch
+from render_jobs import RenderJob, blender_render_command, split_frames
+from convert_to_mp4 import encode_while_rendering, preview_from_frames
 
 # Create MCP server inside Blender
 mcp = FastMCP("Blender MCP Server")
 
-@mcp.tool()
+# Plain callables of every registered tool, used by execute_batch
+_TOOL_REGISTRY = {}
+
+# Object created by the most recent creation tool (read by execute_batch)
+_last_created_object = None
+
+# Shared mesh datablock names keyed by (shape, parameters) for instancing
+_MESH_CACHE = {}
+
+# Material names keyed by (kind, r, g, b, alpha, blend mode) for reuse
+_MATERIAL_CACHE = {}
+
+# Background render jobs by job id
+_RENDER_JOBS = {}
+
+# Requested -> actual object names per scene, for names Blender had to suffix
+# because another session's scene already uses them
+_OBJECT_ALIASES = {}
+
+
+
+# ========== METRICS SIDE CHANNEL ==========
+# stdout belongs to MCP, so timings go to a JSON-lines file or stderr chosen
+# by BLENDER_MCP_METRICS (the launcher's --metrics flag sets it). Each record
+# starts with "mcp_metric" so the launcher can pick them out of Blender's
+# own stderr output.
+
+class _Metrics:
+    """Per-tool timing records, sampled at BLENDER_MCP_METRICS_SAMPLE (0-1)"""
+    
+    def __init__(self):
+        target = os.environ.get("BLENDER_MCP_METRICS")
+        self.sample_rate = float(os.environ.get("BLENDER_MCP_METRICS_SAMPLE", "1"))
+        self.enabled = bool(target) and self.sample_rate > 0
+        self.ops_seconds = 0.0
+        self.depsgraph_seconds = 0.0
+        self._depsgraph_started = None
+        self._out = None
+        if self.enabled:
+            self._out = sys.stderr if target == "stderr" else open(target, "a", buffering=1, encoding="utf-8")
+    
+    def sampled(self):
+        return self.enabled and (self.sample_rate >= 1 or random.random() < self.sample_rate)
+    
+    @contextlib.contextmanager
+    def ops(self):
+        """Time a bpy.ops call"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.ops_seconds += time.perf_counter() - start
+    
+    def depsgraph_pre(self):
+        self._depsgraph_started = time.perf_counter()
+    
+    def depsgraph_post(self):
+        if self._depsgraph_started is not None:
+            self.depsgraph_seconds += time.perf_counter() - self._depsgraph_started
+            self._depsgraph_started = None
+    
+    def write(self, kind, **fields):
+        try:
+            self._out.write(json.dumps({"mcp_metric": kind, "ts": round(time.time(), 3), **fields}) + "\n")
+        except Exception:
+            pass  # Metrics must never break a tool
+
+
+_METRICS = _Metrics()
+
+
+# Persistent so pooled workers keep them across read_factory_settings
+@bpy.app.handlers.persistent
+def _on_depsgraph_pre(*args):
+    _METRICS.depsgraph_pre()
+
+
+@bpy.app.handlers.persistent
+def _on_depsgraph_post(*args):
+    _METRICS.depsgraph_post()
+
+
+if _METRICS.enabled:
+    bpy.app.handlers.depsgraph_update_pre.append(_on_depsgraph_pre)
+    bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_post)
+
+
+def _instrumented(fn):
+    """Wrap a tool so sampled calls emit a timing record"""
+    def start():
+        return time.perf_counter(), _METRICS.ops_seconds, _METRICS.depsgraph_seconds
+    
+    def finish(started, result):
+        wall, ops, depsgraph = started
+        _METRICS.write(
+            "tool",
+            tool=fn.__name__,
+            wall_ms=round((time.perf_counter() - wall) * 1000, 3),
+            ops_ms=round((_METRICS.ops_seconds - ops) * 1000, 3),
+            depsgraph_ms=round((_METRICS.depsgraph_seconds - depsgraph) * 1000, 3),
+            # Async tools finish on the transport thread, where bpy is off limits
+            objects=len(bpy.data.objects) if threading.current_thread() is threading.main_thread() else None,
+            ok=not str(result).startswith("Error"),
+        )
+    
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            if not _METRICS.sampled():
+                return await fn(*args, **kwargs)
+            started = start()
+            result = "Error: raised"
+            try:
+                result = await fn(*args, **kwargs)
+                return result
+            finally:
+                finish(started, result)
+    else:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _METRICS.sampled():
+                return fn(*args, **kwargs)
+            started = start()
+            result = "Error: raised"
+            try:
+                result = fn(*args, **kwargs)
+                return result
+            finally:
+                finish(started, result)
+    return wrapper
+
+
+def _dispatched(fn):
+    """MCP entry point of a tool: sync tools run through _in_session"""
+    if inspect.iscoroutinefunction(fn):
+        return fn  # Async tools dispatch their own bpy sections
+    
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await _in_session(functools.partial(fn, *args, **kwargs))
+    return wrapper
+
+
+def _tool():
+    """Register a function as an MCP tool and make it available to execute_batch"""
+    def decorator(fn):
+        fn = _instrumented(fn)
+        _TOOL_REGISTRY[fn.__name__] = fn
+        mcp.tool()(_dispatched(fn))
+        return fn
+    return decorator
+
+
+# ========== MAIN-THREAD WORK QUEUE ==========
+# bpy is not thread-safe, so MCP runs on a background thread (parsing and
+# answering requests concurrently) while every bpy section is queued to the
+# main thread, the queue's single consumer. It takes bursts of queued calls,
+# one per session in turn, and evaluates the depsgraph once per burst instead
+# of after each small edit. With --transport sse/streamable-http each client
+# session also gets its own scene, entered with temp_override.
+
+class _WorkQueue:
+    """Round-robin queue of bpy calls from MCP sessions, drained on the main thread
+    
+    Args:
+        max_burst: Most calls run between two depsgraph evaluations
+    """
+    
+    def __init__(self, max_burst=64):
+        self.max_burst = max_burst
+        self.per_session_scenes = False
+        self._queues = OrderedDict()  # session key -> deque of (call, future, queued at)
+        self._scenes = {}  # session key -> scene name
+        # Keys are never reused (unlike id()), so a new session can't inherit
+        # the key of one whose scene is still waiting to be dropped
+        self._keys = weakref.WeakKeyDictionary()  # session -> key
+        self._next_key = itertools.count()
+        self._ready = threading.Condition()
+        self._stopped = False
+        self._depth = 0
+        self._stats = {"submitted": 0, "completed": 0, "bursts": 0, "max_depth": 0, "busy_seconds": 0.0}
+        self._waits = deque(maxlen=1000)
+    
+    def session_key(self, session):
+        """Key of an MCP session; its scene is removed once the session is gone"""
+        with self._ready:
+            key = self._keys.get(session)
+            if key is None:
+                key = self._keys[session] = next(self._next_key)
+                self._scenes[key] = None
+                weakref.finalize(session, self.submit, key, None)
+        return key
+    
+    def submit(self, session, call):
+        """Queue call (None removes the session's scene) and return its Future"""
+        future = Future()
+        with self._ready:
+            self._queues.setdefault(session, deque()).append((call, future, time.perf_counter()))
+            self._depth += 1
+            self._stats["submitted"] += 1
+            self._stats["max_depth"] = max(self._stats["max_depth"], self._depth)
+            self._ready.notify()
+        return future
+    
+    def stop(self):
+        with self._ready:
+            self._stopped = True
+            self._ready.notify()
+    
+    def stats(self):
+        """Queue depth, wait times (ms) and burst sizes"""
+        with self._ready:
+            waits = sorted(self._waits)
+            stats = dict(self._stats, depth=self._depth, sessions=len(self._queues))
+        stats["busy_seconds"] = round(stats["busy_seconds"], 3)
+        stats["mean_burst"] = round(stats["completed"] / stats["bursts"], 2) if stats["bursts"] else None
+        for label, q in (("wait_ms_p50", 0.5), ("wait_ms_p95", 0.95), ("wait_ms_max", 1.0)):
+            stats[label] = round(waits[min(int(q * len(waits)), len(waits) - 1)] * 1000, 3) if waits else None
+        return stats
+    
+    def _take_burst(self):
+        """Wait for work, then take up to max_burst calls, one session at a time"""
+        with self._ready:
+            while not self._queues and not self._stopped:
+                self._ready.wait()
+            burst = []
+            while self._queues and len(burst) < self.max_burst:
+                session, queue = self._queues.popitem(last=False)
+                burst.append((session, *queue.popleft()))
+                # Sessions with more work go to the back of the line
+                if queue:
+                    self._queues[session] = queue
+            self._depth -= len(burst)
+            return burst
+    
+    def _scene(self, session):
+        if not self.per_session_scenes:
+            return bpy.context.scene
+        name = self._scenes.get(session)
+        scene = bpy.data.scenes.get(name) if name else None
+        if scene is None:
+            scene = bpy.data.scenes.new(f"MCP Session {len(bpy.data.scenes)}")
+            self._scenes[session] = scene.name
+        return scene
+    
+    def _drop_scene(self, session):
+        name = self._scenes.pop(session, None)
+        scene = bpy.data.scenes.get(name) if name else None
+        if scene is None:
+            return
+        for obj in list(scene.objects):
+            if len(obj.users_scene) == 1:
+                bpy.data.objects.remove(obj, do_unlink=True)
+        _OBJECT_ALIASES.pop(scene.name, None)
+        _SCENE_TRACKERS.pop(scene.name, None)
+        bpy.data.scenes.remove(scene)
+    
+    def run(self):
+        """Serve queued calls until stop(), then get ready for the next run()"""
+        while burst := self._take_burst():
+            started = time.perf_counter()
+            touched = {}
+            for session, call, future, queued_at in burst:
+                self._waits.append(started - queued_at)
+                if call is None:
+                    self._drop_scene(session)
+                    continue
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    scene = self._scene(session)
+                    touched[scene.name] = scene
+                    with bpy.context.temp_override(scene=scene, view_layer=scene.view_layers[0]):
+                        future.set_result(call())
+                except BaseException as e:
+                    future.set_exception(e)
+            
+            # One depsgraph evaluation for the whole burst
+            for scene in touched.values():
+                if scene.name in bpy.data.scenes:
+                    scene.view_layers[0].update()
+            
+            busy = time.perf_counter() - started
+            with self._ready:
+                self._stats["completed"] += len(burst)
+                self._stats["bursts"] += 1
+                self._stats["busy_seconds"] += busy
+            if _METRICS.sampled():
+                _METRICS.write(
+                    "queue",
+                    burst=len(burst),
+                    depth=self._depth,
+                    wait_ms_max=round(max(started - queued_at for *_, queued_at in burst) * 1000, 3),
+                    busy_ms=round(busy * 1000, 3),
+                )
+        self._stopped = False
+
+
+_WORK_QUEUE = _WorkQueue()
+
+
+async def _in_session(call):
+    """Run a bpy call on the main thread (in the caller's session scene) and await it"""
+    session = None
+    if _WORK_QUEUE.per_session_scenes:
+        try:
+            session = _WORK_QUEUE.session_key(mcp.get_context().session)
+        except ValueError:
+            pass  # Not inside a client request
+    return await asyncio.wrap_future(_WORK_QUEUE.submit(session, call))
+
+
+def _serve_on_worker_thread(serve):
+    """Run serve() (the MCP transport) on a thread while this thread drains the work queue"""
+    def target():
+        try:
+            serve()
+        finally:
+            _WORK_QUEUE.stop()
+    
+    thread = threading.Thread(target=target, name="mcp-transport", daemon=True)
+    thread.start()
+    _WORK_QUEUE.run()
+    thread.join()
+
+
+def _serve_sessions(transport, host, port, uds=None):
+    """Serve many MCP clients over HTTP from this Blender, one scene per session"""
+    import uvicorn
+    
+    _WORK_QUEUE.per_session_scenes = True
+    mcp.settings.host = host
+    app = mcp.streamable_http_app() if transport == "streamable-http" else mcp.sse_app()
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, uds=uds, log_level="warning"))
+    _serve_on_worker_thread(server.run)
+
+
+def _get_object(name):
+    """Object called name in the current scene, following clash renames"""
+    scene = bpy.context.scene
+    obj = scene.objects.get(name)
+    if obj is None and name in _OBJECT_ALIASES.get(scene.name, {}):
+        obj = scene.objects.get(_OBJECT_ALIASES[scene.name][name])
+    return obj
+
+
+def _note_alias(name, obj):
+    """Remember that the object requested as name got another name"""
+    if obj.name != name:
+        _OBJECT_ALIASES.setdefault(bpy.context.scene.name, {})[name] = obj.name
+
+
+def _note_created(obj):
+    """Remember the object a creation tool just made so batches can reference it"""
+    global _last_created_object
+    _last_created_object = obj
+    return obj
+
+
+# ========== DATA-API CONSTRUCTION HELPERS ==========
+# bpy.ops primitives depend on context, push undo steps and update the view
+# layer on every call, which gets slower as the scene grows. These helpers
+# build datablocks directly so creation cost stays flat.
+
+def _link_object(name, data, location=None):
+    """Create an object for data and link it straight into the scene collection"""
+    obj = bpy.data.objects.new(name, data)
+    if location is not None:
+        obj.location = location
+    bpy.context.scene.collection.objects.link(obj)
+    _note_alias(name, obj)
+    return _note_created(obj)
+
+
+def _build_mesh(name, verts, faces):
+    """Create a mesh datablock from vertex coordinates and face index lists"""
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(verts, [], faces)
+    mesh.update(calc_edges=True)
+    return mesh
+
+
+def _circle_mesh(name, radius, vertices=32):
+    """Filled (NGON) circle in the XY plane, matching primitive_circle_add"""
+    step = 2 * math.pi / vertices
+    verts = [(radius * math.cos(i * step), radius * math.sin(i * step), 0.0) for i in range(vertices)]
+    return _build_mesh(name, verts, [list(range(vertices))])
+
+
+def _plane_mesh(name, size=1.0):
+    """Square in the XY plane, matching primitive_plane_add"""
+    h = size / 2
+    verts = [(-h, -h, 0.0), (h, -h, 0.0), (h, h, 0.0), (-h, h, 0.0)]
+    return _build_mesh(name, verts, [[0, 1, 2, 3]])
+
+
+def _cube_mesh(name, size=2.0):
+    """Cube centered on the origin, matching primitive_cube_add"""
+    h = size / 2
+    verts = [(x, y, z) for x in (-h, h) for y in (-h, h) for z in (-h, h)]
+    faces = [[0, 1, 3, 2], [4, 6, 7, 5], [0, 4, 5, 1], [2, 3, 7, 6], [0, 2, 6, 4], [1, 5, 7, 3]]
+    return _build_mesh(name, verts, faces)
+
+
+def _shared_mesh(key, build):
+    """Return the cached mesh for key, building it on first use
+    
+    Meshes are looked up by name each time so a cache entry never outlives
+    a datablock that was removed or reloaded.
+    """
+    mesh = bpy.data.meshes.get(_MESH_CACHE.get(key, ""))
+    if mesh is None:
+        mesh = build()
+        # Empty slot so instances can carry object-linked materials
+        mesh.materials.append(None)
+        mesh["mcp_shared"] = True
+        _MESH_CACHE[key] = mesh.name
+    return mesh
+
+
+def _assign_material(obj, mat):
+    """Put mat in the object's first material slot
+    
+    Objects sharing their data with others get an object-linked slot so
+    recoloring one instance leaves the rest untouched.
+    """
+    if obj.data.users > 1 or obj.data.get("mcp_shared"):
+        if not obj.material_slots:
+            obj.data.materials.append(None)
+        slot = obj.material_slots[0]
+        slot.link = 'OBJECT'
+        slot.material = mat
+    elif obj.data.materials:
+        obj.data.materials[0] = mat
+    else:
+        obj.data.materials.append(mat)
+
+
+def _cached_material(kind, color, alpha, build):
+    """Return the material for this color/alpha, building it on first use
+    
+    Returns:
+        (material, created) tuple
+    """
+    blend = 'BLEND' if alpha < 1.0 else 'OPAQUE'
+    key = (kind, *(round(float(c), 4) for c in color), round(float(alpha), 4), blend)
+    mat = bpy.data.materials.get(_MATERIAL_CACHE.get(key, ""))
+    if mat is not None:
+        return mat, False
+    mat = build()
+    _MATERIAL_CACHE[key] = mat.name
+    return mat, True
+
+
+def _build_surface_material(color, alpha):
+    """Principled BSDF material named after its color, e.g. 'Color_FF3333'"""
+    name = "Color_" + "".join(f"{round(c * 255):02X}" for c in color)
+    if alpha < 1.0:
+        name += f"_A{round(alpha * 100)}"
+    
+    mat = bpy.data.materials.new(name)
+    mat.use_nodes = True
+    
+    # Get the Principled BSDF node
+    bsdf = mat.node_tree.nodes.get('Principled BSDF')
+    if bsdf:
+        bsdf.inputs['Base Color'].default_value = (*color, 1.0)
+        bsdf.inputs['Alpha'].default_value = alpha
+        
+        # Enable transparency if alpha < 1
+        if alpha < 1.0:
+            mat.blend_method = 'BLEND'
+    return mat
+
+
+def _purge_orphan_materials():
+    """Remove materials with no users and forget their cache entries"""
+    orphans = [mat for mat in bpy.data.materials if mat.users == 0]
+    for mat in orphans:
+        bpy.data.materials.remove(mat)
+    for key in [key for key, name in _MATERIAL_CACHE.items() if name not in bpy.data.materials]:
+        del _MATERIAL_CACHE[key]
+    return len(orphans)
+
+
+# ========== BULK KEYFRAME HELPERS ==========
+# keyframe_insert() needs the value on the object at that frame, so the old
+# path called frame_set() per key and re-evaluated the whole depsgraph each
+# time. Writing keyframe_points directly skips frame changes entirely.
+
+def _action_fcurves(obj):
+    """Return the F-curve collection driving obj, creating the action if needed"""
+    anim = obj.animation_data or obj.animation_data_create()
+    if anim.action is None:
+        anim.action = bpy.data.actions.new(f"{obj.name}Action")
+    
+    # Layered actions (Blender 4.4+) keep F-curves in a per-slot channelbag
+    if hasattr(anim, "action_slot"):
+        from bpy_extras import anim_utils
+        if anim.action_slot is None:
+            anim.action_slot = anim.action.slots.new(id_type='OBJECT', name=obj.name)
+        return anim_utils.action_ensure_channelbag_for_slot(anim.action, anim.action_slot).fcurves
+    return anim.action.fcurves
+
+
+def _insert_keyframes(obj, data_path, frames, values, interpolation=None):
+    """Write keyframes for every channel of a property in one pass
+    
+    Args:
+        obj: Object to animate
+        data_path: Property path (e.g., 'location')
+        frames: Array of n frame numbers
+        values: Array of shape (n, channels)
+        interpolation: Optional interpolation (e.g., 'LINEAR') for the written keys
+    """
+    fcurves = _action_fcurves(obj)
+    for index in range(values.shape[1]):
+        fcurve = fcurves.find(data_path, index=index) or fcurves.new(data_path, index=index)
+        points = fcurve.keyframe_points
+        
+        # Keep the last key given for each frame
+        co = np.column_stack((frames, values[:, index])).astype(np.float32)
+        _, last = np.unique(co[::-1, 0], return_index=True)
+        co = co[::-1][last]
+        
+        # Keys already on those frames get the new value in place; the rest
+        # are appended. Existing keys keep their interpolation and handle
+        # types, and update() sorts the curve.
+        count = len(points)
+        existing = np.empty(count * 2, dtype=np.float32)
+        points.foreach_get("co", existing)
+        existing = existing.reshape(-1, 2)
+        order = np.argsort(existing[:, 0], kind="stable")
+        at = np.minimum(np.searchsorted(existing[order, 0], co[:, 0]), max(count - 1, 0))
+        matched = existing[order[at], 0] == co[:, 0] if count else np.zeros(len(co), dtype=bool)
+        replaced = order[at[matched]]
+        shift = co[matched, 1] - existing[replaced, 1]
+        existing[replaced, 1] = co[matched, 1]
+        added = co[~matched]
+        if len(replaced):
+            # Handles move with their key so custom handle shapes survive
+            for handle in ("handle_left", "handle_right"):
+                positions = np.empty(count * 2, dtype=np.float32)
+                points.foreach_get(handle, positions)
+                positions.reshape(-1, 2)[replaced, 1] += shift
+                points.foreach_set(handle, positions)
+        
+        points.add(len(added))
+        points.foreach_set("co", np.concatenate((existing, added)).ravel())
+        if interpolation:
+            for i in np.concatenate((replaced, np.arange(count, count + len(added)))):
+                points[int(i)].interpolation = interpolation
+        fcurve.update()
+    
+    # F-curve edits don't tag the object; let the depsgraph (and get_scene_state) see them
+    obj.update_tag()
+
+
+@_tool()
 def clear_scene():
     """Delete all objects in the current scene"""
-    bpy.ops.object.select_all(action='SELECT')
-    bpy.ops.object.delete()
+    for obj in list(bpy.context.scene.objects):
+        bpy.data.objects.remove(obj, do_unlink=True)
+    _OBJECT_ALIASES.pop(bpy.context.scene.name, None)
     return "Scene cleared"
 
-@mcp.tool()
+@_tool()
 def add_cube(size: float = 2.0):
     """Add a cube to the scene"""
-    bpy.ops.mesh.primitive_cube_add(size=size)
+    _link_object("Cube", _cube_mesh("Cube", size))
     return f"Cube added with size {size}"
 
-@mcp.tool()
+@_tool()
 def save_file(filepath: str):
     """Save the current Blender scene to a file"""
-    bpy.ops.wm.save_as_mainfile(filepath=filepath)
+    if _WORK_QUEUE.per_session_scenes:
+        # The main database holds every session's scene; write only this
+        # session's scene and what it uses
+        scene = bpy.context.scene
+        bpy.data.libraries.write(os.path.abspath(bpy.path.abspath(filepath)), {scene}, fake_user=True)
+        return f"Scene '{scene.name}' saved to {filepath}"
+    with _METRICS.ops():
+        bpy.ops.wm.save_as_mainfile(filepath=filepath)
     return f"Scene saved to {filepath}"
 
 # ========== 2D ANIMATION TOOLS ==========
 
-@mcp.tool()
+def _write_gp_strokes(gp_obj, strokes):
+    """Append strokes to a Grease Pencil object, grouped by layer and frame
+    
+    Layers and frames are looked up through dicts built once per call
+    instead of scanning layer.frames per stroke, and point data is written
+    from flat buffers with foreach_set.
+    
+    Args:
+        gp_obj: Legacy ('GPENCIL') or v3 ('GREASEPENCIL', Blender 4.3+) object
+        strokes: List of (layer name, frame number, (n, 3) points, radius)
+    
+    Returns:
+        (layers touched, frames touched) counts
+    """
+    gp_data = gp_obj.data
+    layers = {}  # name -> (layer, {frame number: frame})
+    groups = {}  # (layer name, frame number) -> strokes
+    for layer_name, frame_number, points, radius in strokes:
+        groups.setdefault((layer_name, frame_number), []).append((points, radius))
+    
+    for (layer_name, frame_number), group in groups.items():
+        if layer_name not in layers:
+            layer = gp_data.layers.get(layer_name) or gp_data.layers.new(layer_name)
+            layers[layer_name] = (layer, {f.frame_number: f for f in layer.frames})
+        layer, frames = layers[layer_name]
+        frame = frames.get(frame_number)
+        if frame is None:
+            frame = frames[frame_number] = layer.frames.new(frame_number)
+        
+        if gp_obj.type == 'GREASEPENCIL':
+            # v3: strokes are curves in the frame's drawing; new points go
+            # at the end of its point attributes
+            drawing = frame.drawing
+            drawing.add_strokes([len(points) for points, _ in group])
+            added = np.concatenate([points for points, _ in group])
+            radii = np.concatenate([np.full(len(points), radius, dtype=np.float32) for points, radius in group])
+            for name, kind, new_values, size in (("position", 'FLOAT_VECTOR', added, 3),
+                                                 ("radius", 'FLOAT', radii, 1),
+                                                 ("opacity", 'FLOAT', np.ones(len(radii)), 1)):
+                attribute = drawing.attributes.get(name) or drawing.attributes.new(name, kind, 'POINT')
+                key = "vector" if size == 3 else "value"
+                values = np.empty(len(attribute.data) * size, dtype=np.float32)
+                attribute.data.foreach_get(key, values)
+                values[len(values) - new_values.size:] = new_values.ravel()
+                attribute.data.foreach_set(key, values)
+        else:
+            for points, _ in group:
+                stroke = frame.strokes.new()
+                stroke.points.add(len(points))
+                stroke.points.foreach_set("co", points.ravel())
+                stroke.points.foreach_set("pressure", np.ones(len(points), dtype=np.float32))
+    
+    return len(layers), len(groups)
+
+
+@_tool()
 def create_grease_pencil(name: str = "GPencil"):
     """Create a new Grease Pencil object for 2D drawing"""
     try:
         # Try new Blender 4.0+ API first
-        bpy.ops.object.grease_pencil_add()
-        gp_obj = bpy.context.active_object
+        with _METRICS.ops():
+            bpy.ops.object.grease_pencil_add()
+        gp_obj = _note_created(bpy.context.active_object)
         gp_obj.name = name
         return f"Grease Pencil object '{name}' created"
     except AttributeError:
         # Fallback to legacy API for Blender < 4.0
         try:
-            bpy.ops.object.gpencil_add(type='EMPTY')
-            gp_obj = bpy.context.active_object
+            with _METRICS.ops():
+                bpy.ops.object.gpencil_add(type='EMPTY')
+            gp_obj = _note_created(bpy.context.active_object)
             gp_obj.name = name
             return f"Grease Pencil object '{name}' created"
         except Exception as e:
             return f"Error: Could not create Grease Pencil object - {str(e)}"
 
-@mcp.tool()
-def add_gp_stroke(layer_name: str = "Lines", points: list = None, frame: int = 1):
+@_tool()
+def add_gp_stroke(layer_name: str = "Lines", points: list = None, frame: int = 1, tolerance: float = 0.0):
     """Add a stroke to the active Grease Pencil object
     
     Args:
         layer_name: Name of the layer to draw on
         points: List of [x, y, z] coordinates for the stroke
         frame: Frame number to add the stroke to
+        tolerance: If above 0, drop points lying within this distance of
+            the simplified stroke
     """
     if points is None:
         points = [[0, 0, 0], [1, 1, 0], [2, 0, 0]]
     
+    points_in = len(points)
+    if tolerance > 0:
+        points = [points[i] for i in simplify_polyline(points, tolerance)]
+    
     gp_obj = bpy.context.active_object
-    if gp_obj.type not in ('GPENCIL', 'GREASEPENCIL'):
-        return f"Error: Active object is not a Grease Pencil object (type: {gp_obj.type})"
+    if gp_obj is None or gp_obj.type not in ('GPENCIL', 'GREASEPENCIL'):
+        return f"Error: Active object is not a Grease Pencil object (type: {gp_obj.type if gp_obj else None})"
     
     try:
-        gp_data = gp_obj.data
-        
-        # Check if this is legacy Grease Pencil (has layers attribute)
-        if hasattr(gp_data, 'layers') and hasattr(gp_data.layers, 'new'):
-            # Legacy Grease Pencil API (Blender < 4.0)
-            # Get or create layer
-            if layer_name not in gp_data.layers:
-                gp_layer = gp_data.layers.new(layer_name)
-            else:
-                gp_layer = gp_data.layers[layer_name]
-            
-            # Get or create frame
-            gp_frame = gp_layer.frames.new(frame) if frame not in [f.frame_number for f in gp_layer.frames] else gp_layer.frames[frame]
-            
-            # Create stroke
-            stroke = gp_frame.strokes.new()
-            stroke.points.add(len(points))
-            
-            for i, point in enumerate(points):
-                stroke.points[i].co = point
-                stroke.points[i].pressure = 1.0
-            
-            return f"Added stroke with {len(points)} points to layer '{layer_name}' at frame {frame}"
-        else:
-            # New Grease Pencil v3 (Blender 4.0+)
-            # The new system uses a different approach - we'll use drawing mode
-            # For now, return a message indicating this needs manual drawing
-            return f"Note: Blender 4.0+ Grease Pencil v3 detected. Programmatic stroke creation requires using the drawing operators. Object created successfully - please use Blender's Draw mode to add strokes manually."
+        coords = np.asarray(points, dtype=np.float32).reshape(-1, 3)
+        _write_gp_strokes(gp_obj, [(layer_name, frame, coords, 0.02)])
+        simplified = f" ({points_in} in, {len(points)} out at tolerance {tolerance})" if tolerance > 0 else ""
+        return f"Added stroke with {len(points)} points to layer '{layer_name}' at frame {frame}{simplified}"
     except Exception as e:
         return f"Error adding stroke: {str(e)}"
 
-@mcp.tool()
+
+@_tool()
+def add_gp_strokes(strokes: list, object_name: str = None, tolerance: float = 0.0):
+    """Add many strokes across layers and frames to a Grease Pencil object in one call
+    
+    Args:
+        strokes: List of {"points": [[x, y, z], ...], "layer": "Lines",
+            "frame": 1, "radius": 0.02}; layer, frame and radius are optional
+        object_name: Grease Pencil object (defaults to the active object)
+        tolerance: If above 0, drop points lying within this distance of
+            each simplified stroke
+    """
+    gp_obj = _get_object(object_name) if object_name else bpy.context.active_object
+    if gp_obj is None or gp_obj.type not in ('GPENCIL', 'GREASEPENCIL'):
+        return f"Error: '{object_name or 'active object'}' is not a Grease Pencil object"
+    
+    prepared = []
+    points_in = points_out = 0
+    for i, stroke in enumerate(strokes):
+        coords = np.asarray(stroke.get("points", []), dtype=np.float32)
+        if coords.ndim != 2 or coords.shape[1] != 3 or len(coords) < 2:
+            return f"Error: Stroke {i} needs at least two [x, y, z] points"
+        points_in += len(coords)
+        if tolerance > 0:
+            coords = coords[simplify_polyline(coords, tolerance)]
+        points_out += len(coords)
+        prepared.append((stroke.get("layer", "Lines"), int(stroke.get("frame", 1)), coords, float(stroke.get("radius", 0.02))))
+    
+    try:
+        layer_count, frame_count = _write_gp_strokes(gp_obj, prepared)
+    except Exception as e:
+        return f"Error adding strokes: {str(e)}"
+    
+    simplified = f", {points_in} points in at tolerance {tolerance}" if tolerance > 0 else ""
+    return (f"Added {len(prepared)} strokes ({points_out} points{simplified}) to {frame_count} frame(s) "
+            f"on {layer_count} layer(s) of '{gp_obj.name}'")
+
+@_tool()
 def set_gp_material(name: str, color: list = None, alpha: float = 1.0):
     """Create and assign a material to the active Grease Pencil object
     
@@ -145,7 +811,7 @@ def set_gp_material(name: str, color: list = None, alpha: float = 1.0):
     if gp_obj.type not in ('GPENCIL', 'GREASEPENCIL'):
         return f"Error: Active object is not a Grease Pencil object (type: {gp_obj.type})"
     
-    try:
+    def build():
         # Create material
         mat = bpy.data.materials.new(name)
         
@@ -171,15 +837,23 @@ def set_gp_material(name: str, color: list = None, alpha: float = 1.0):
                 
                 # Link nodes
                 mat.node_tree.links.new(bsdf.outputs['BSDF'], output.inputs['Surface'])
+        return mat
+    
+    try:
+        # Reuse an identical material if one exists
+        mat, created = _cached_material("gpencil", color, alpha, build)
         
         # Assign to object
-        gp_obj.data.materials.append(mat)
+        if mat.name not in gp_obj.data.materials:
+            gp_obj.data.materials.append(mat)
         
+        if not created:
+            return f"Material '{mat.name}' reused for color {color} and alpha {alpha}"
         return f"Material '{name}' created with color {color} and alpha {alpha}"
     except Exception as e:
         return f"Error creating material: {str(e)}"
 
-@mcp.tool()
+@_tool()
 def setup_2d_camera(location: list = None, ortho_scale: float = 10.0):
     """Setup an orthographic camera for 2D animation
     
@@ -190,21 +864,19 @@ def setup_2d_camera(location: list = None, ortho_scale: float = 10.0):
     if location is None:
         location = [0, 0, 10]
     
-    # Create camera
-    bpy.ops.object.camera_add(location=location)
-    camera = bpy.context.active_object
+    # Create orthographic camera
+    camera_data = bpy.data.cameras.new("Camera")
+    camera_data.type = 'ORTHO'
+    camera_data.ortho_scale = ortho_scale
+    camera = _link_object("Camera", camera_data, location)
     camera.rotation_euler = (0, 0, 0)
     
-    # Set to orthographic
-    camera.data.type = 'ORTHO'
-    camera.data.ortho_scale = ortho_scale
-    
     # Set as active camera
     bpy.context.scene.camera = camera
     
     return f"2D camera created at {location} with ortho scale {ortho_scale}"
 
-@mcp.tool()
+@_tool()
 def set_keyframe(object_name: str, property_path: str, frame: int, value: float):
     """Set a keyframe for animation
     
@@ -214,33 +886,27 @@ def set_keyframe(object_name: str, property_path: str, frame: int, value: float)
         frame: Frame number
         value: Value to set
     """
-    obj = bpy.data.objects.get(object_name)
+    obj = _get_object(object_name)
     if not obj:
         return f"Error: Object '{object_name}' not found"
     
-    bpy.context.scene.frame_set(frame)
-    
-    # Set the value
-    if property_path == 'location':
-        obj.location = value if isinstance(value, (list, tuple)) else [value, value, value]
-    elif property_path == 'rotation_euler':
-        obj.rotation_euler = value if isinstance(value, (list, tuple)) else [value, value, value]
-    elif property_path == 'scale':
-        obj.scale = value if isinstance(value, (list, tuple)) else [value, value, value]
-    
-    # Insert keyframe
-    obj.keyframe_insert(data_path=property_path, frame=frame)
+    if property_path in ('location', 'rotation_euler', 'scale'):
+        vector = value if isinstance(value, (list, tuple)) else [value, value, value]
+        setattr(obj, property_path, vector)
+        _insert_keyframes(obj, property_path, np.array([frame]), np.array([vector], dtype=np.float64))
+    else:
+        obj.keyframe_insert(data_path=property_path, frame=frame)
     
     return f"Keyframe set for '{object_name}.{property_path}' at frame {frame}"
 
-@mcp.tool()
+@_tool()
 def set_animation_range(start_frame: int = 1, end_frame: int = 250):
     """Set the animation frame range"""
     bpy.context.scene.frame_start = start_frame
     bpy.context.scene.frame_end = end_frame
     return f"Animation range set to {start_frame}-{end_frame}"
 
-@mcp.tool()
+@_tool()
 def set_render_settings(resolution_x: int = 1920, resolution_y: int = 1080, fps: int = 24, output_path: str = "//render_", format: str = "PNG"):
     """Configure render settings for animation
     
@@ -268,22 +934,577 @@ def set_render_settings(resolution_x: int = 1920, resolution_y: int = 1080, fps:
         scene.render.image_settings.file_format = 'PNG'
         return f"Render settings: {resolution_x}x{resolution_y} @ {fps}fps, PNG output: {output_path}"
 
-@mcp.tool()
-def render_animation(output_path: str = None):
-    """Render the animation to files (uses current render settings)
+def _save_snapshot():
+    """Save a copy of the current file to a temp folder for a render process
+    
+    Returns:
+        (workdir, snapshot_path) tuple
+    """
+    workdir = tempfile.mkdtemp(prefix="blender_mcp_render_")
+    snapshot = os.path.join(workdir, "snapshot.blend")
+    with _METRICS.ops():
+        bpy.ops.wm.save_as_mainfile(filepath=snapshot, copy=True)
+    return workdir, snapshot
+
+
+def _encode_frames_job(frame_paths, output, fps):
+    """Encoder that streams a farm's PNG frames into the requested MP4 as they render
+    
+    Every frame file must be complete or absent: the caller removes the
+    images of an earlier render to the same path before the workers start.
+    
+    Returns:
+        (start, finalize): start(job) launches the encoder beside the
+        running job; finalize(job), run once every worker has exited,
+        waits for it to close the video
+    """
+    stop = threading.Event()
+    done = threading.Event()
+    encoding = None
+    
+    def encode():
+        # Keep convert_to_mp4's messages off the MCP stdout
+        log = io.StringIO()
+        ok = encode_while_rendering(frame_paths, output, fps=fps, stop=stop, done=done, report=log)
+        return None if ok else f"MP4 encoding failed: {log.getvalue().strip()[-500:]}"
+    
+    def start(job):
+        nonlocal encoding
+        encoding = asyncio.ensure_future(asyncio.to_thread(encode))
+        job.add_cancel_callback(stop.set)
+        
+        async def abandon(job):
+            if job.status in ("failed", "cancelled"):
+                stop.set()
+        job.add_listener(abandon)
+    
+    async def finalize(job):
+        done.set()
+        return await encoding
+    return start, finalize
+
+
+# ========== RENDER CACHE ==========
+# A frame's digest covers everything that ends up in its pixels: render,
+# engine and color management settings, every object's geometry and
+# modifiers, and at that frame the active camera, world, every object's
+# world matrix, visibility and color, light and camera settings and
+# material values. Digests of rendered frames are kept in a sidecar file
+# next to the images, and a frame whose image exists with an unchanged
+# digest is not rendered again.
+
+_RENDER_CACHE_FILE = ".render_cache.json"
+
+
+def _socket_values(node_tree):
+    """Default values of the unlinked node inputs of a material or world"""
+    if node_tree is None:
+        return []
+    values = []
+    for node in node_tree.nodes:
+        for socket in node.inputs:
+            if socket.is_linked or not hasattr(socket, "default_value"):
+                continue
+            value = socket.default_value
+            values.append(value if isinstance(value, (int, float, str, bool)) else tuple(value))
+    return values
+
+
+def _rna_values(struct):
+    """Values of a struct's RNA properties (e.g. a light, modifier or render settings)
+    
+    Nested structs and collections are skipped; pointers to datablocks
+    contribute the datablock's name.
+    """
+    if struct is None:
+        return None
+    values = []
+    for prop in struct.bl_rna.properties:
+        if prop.identifier == "rna_type" or prop.type == 'COLLECTION':
+            continue
+        try:
+            value = getattr(struct, prop.identifier)
+        except AttributeError:
+            continue
+        if prop.type == 'POINTER':
+            if not isinstance(value, bpy.types.ID):
+                continue
+            value = value.name
+        elif isinstance(value, set):
+            value = sorted(value)
+        elif hasattr(value, "__len__") and not isinstance(value, str):
+            value = tuple(value)
+        values.append((prop.identifier, value))
+    return values
+
+
+def _geometry_digest(obj):
+    """Hash of an object's data: mesh faces and vertices, curve points or Grease Pencil strokes"""
+    data = obj.data
+    digest = hashlib.sha256(repr((obj.type, _rna_values(data))).encode())
+    
+    def add(collection, attr, size, dtype=np.float32):
+        values = np.empty(len(collection) * size, dtype=dtype)
+        collection.foreach_get(attr, values)
+        digest.update(values.tobytes())
+    
+    if obj.type == 'MESH':
+        add(data.vertices, "co", 3)
+        add(data.loops, "vertex_index", 1, np.int32)
+        add(data.polygons, "loop_total", 1, np.int32)
+        add(data.polygons, "material_index", 1, np.int32)
+    elif obj.type in ('CURVE', 'SURFACE', 'FONT'):
+        for spline in data.splines:
+            digest.update(repr(_rna_values(spline)).encode())
+            add(spline.points, "co", 4)
+            for attr in ("co", "handle_left", "handle_right"):
+                add(spline.bezier_points, attr, 3)
+    elif obj.type == 'GPENCIL':
+        for layer in data.layers:
+            digest.update(repr(_rna_values(layer)).encode())
+            for frame in layer.frames:
+                digest.update(repr(frame.frame_number).encode())
+                for stroke in frame.strokes:
+                    digest.update(repr((stroke.material_index, stroke.line_width, stroke.use_cyclic)).encode())
+                    add(stroke.points, "co", 3)
+                    add(stroke.points, "pressure", 1)
+    elif obj.type == 'GREASEPENCIL':
+        for layer in data.layers:
+            digest.update(repr(_rna_values(layer)).encode())
+            for frame in layer.frames:
+                digest.update(repr(frame.frame_number).encode())
+                drawing = frame.drawing
+                add(drawing.curve_offsets, "value", 1, np.int32)
+                for name, key, size in (("position", "vector", 3), ("radius", "value", 1),
+                                        ("opacity", "value", 1), ("material_index", "value", 1)):
+                    attribute = drawing.attributes.get(name)
+                    if attribute is not None:
+                        add(attribute.data, key, size, np.int32 if name == "material_index" else np.float32)
+    return digest.digest()
+
+
+def _frame_digests(scene, frames):
+    """Content hash of the scene as it renders at each frame
+    
+    Returns:
+        Dict of frame -> hex digest
+    """
+    render = scene.render
+    static = hashlib.sha256(repr((
+        _rna_values(render), _rna_values(render.image_settings),
+        _rna_values(scene.display_settings), _rna_values(scene.display), _rna_values(scene.display.shading),
+        _rna_values(scene.eevee), _rna_values(getattr(scene, "cycles", None)),
+    )).encode())
+    
+    objects = list(scene.objects)
+    static.update(repr([
+        (obj.name, obj.type, obj.data.name if obj.data else None,
+         [slot.material.name if slot.material else None for slot in obj.material_slots])
+        for obj in objects
+    ]).encode())
+    geometry = {}  # Objects sharing data hash it once
+    for obj in objects:
+        if obj.data is not None and obj.data not in geometry:
+            geometry[obj.data] = _geometry_digest(obj)
+        static.update(geometry.get(obj.data, b""))
+    
+    materials = sorted(
+        {slot.material for obj in objects for slot in obj.material_slots if slot.material},
+        key=lambda material: material.name,
+    )
+    # Light and camera settings and modifiers may be animated, so they are read per frame
+    settings = [obj.data for obj in objects if obj.type in ('LIGHT', 'CAMERA')]
+    modified = [obj for obj in objects if obj.modifiers]
+    shape_keys = [obj.data.shape_keys for obj in objects if obj.type == 'MESH' and obj.data.shape_keys]
+    matrices = np.empty(len(objects) * 16, dtype=np.float32)
+    colors = np.empty(len(objects) * 4, dtype=np.float32)
+    hidden = np.empty(len(objects), dtype=bool)
+    
+    current = scene.frame_current
+    digests = {}
+    try:
+        for frame in frames:
+            scene.frame_set(frame)
+            digest = static.copy()
+            scene.objects.foreach_get("matrix_world", matrices)
+            scene.objects.foreach_get("color", colors)
+            scene.objects.foreach_get("hide_render", hidden)
+            for array in (matrices, colors, hidden):
+                digest.update(array.tobytes())
+            
+            world = scene.world
+            digest.update(repr((
+                scene.camera.name if scene.camera else None,
+                _rna_values(scene.view_settings),
+                _rna_values(world), _socket_values(world.node_tree) if world else None,
+                [_rna_values(data) for data in settings],
+                [[_rna_values(modifier) for modifier in obj.modifiers] for obj in modified],
+                [[block.value for block in key.key_blocks] for key in shape_keys],
+                [(tuple(material.diffuse_color), _socket_values(material.node_tree)) for material in materials],
+            )).encode())
+            digests[frame] = digest.hexdigest()
+    finally:
+        scene.frame_set(current)
+    return digests
+
+
+def _read_render_cache(path):
+    """Image name -> digest map stored beside earlier renders"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _prepare_render(output_path, workers, use_cache=None):
+    """Snapshot the scene and build the worker commands for render_animation
+    
+    With use_cache, frames whose image is already on disk with an unchanged
+    digest are skipped and the rest are rendered as explicit frame lists.
+    It defaults to on for image sequences; movies default to Blender's own
+    FFMPEG output, since caching them means rendering frames and encoding
+    with ffmpeg.
+    
+    Returns:
+        (commands, total_frames, output path, workdir, start_encoder, finalize,
+        cached_frames) tuple; start_encoder is None unless an MP4 is encoded
+        from frames while they render
+    """
+    scene = bpy.context.scene
+    if output_path:
+        scene.render.filepath = output_path
+    
+    # The snapshot lives in a temp folder, so "//" paths must be resolved first
+    actual_path = os.path.abspath(bpy.path.abspath(scene.render.filepath))
+    frames = list(range(scene.frame_start, scene.frame_end + 1, scene.frame_step))
+    movie = scene.render.image_settings.file_format == 'FFMPEG'
+    if use_cache is None:
+        use_cache = not movie
+    
+    # Movie files can't be written by several processes or updated in place;
+    # render frames instead and encode them into the movie while the farm runs
+    frame_output, file_format, start_encoder, encoded = actual_path, None, None, None
+    frame_paths = None
+    if movie and (workers > 1 or use_cache):
+        frames_dir = os.path.splitext(actual_path)[0] + "_frames"
+        os.makedirs(frames_dir, exist_ok=True)
+        frame_output = os.path.join(frames_dir, "frame_")
+        file_format = "PNG"
+        frame_paths = {frame: f"{frame_output}{frame:04d}.png" for frame in frames}
+        start_encoder, encoded = _encode_frames_job(list(frame_paths.values()), actual_path, scene.render.fps)
+    elif not movie:
+        frame_paths = {
+            frame: os.path.abspath(bpy.path.abspath(scene.render.frame_path(frame=frame)))
+            for frame in frames
+        }
+    
+    to_render, record = frames, None
+    if use_cache and frames:
+        cache_path = os.path.join(os.path.dirname(frame_paths[frames[0]]), _RENDER_CACHE_FILE)
+        cache = _read_render_cache(cache_path)
+        digests = _frame_digests(scene, frames)
+        names = {frame: os.path.basename(path) for frame, path in frame_paths.items()}
+        to_render = [
+            frame for frame in frames
+            if cache.get(names[frame]) != digests[frame] or not os.path.exists(frame_paths[frame])
+        ]
+        
+        def record():
+            cache.update({names[frame]: digests[frame] for frame in to_render})
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, "w") as f:
+                json.dump(cache, f, indent=1, sort_keys=True)
+    
+    async def finalize(job):
+        if record:
+            record()
+        return await encoded(job) if encoded else None
+    
+    if start_encoder:
+        # Old images of the frames being rendered would be encoded before
+        # the workers overwrite them
+        for frame in to_render:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(frame_paths[frame])
+    if not to_render:
+        return [], 0, actual_path, None, start_encoder, finalize, len(frames)
+    
+    workdir, snapshot = _save_snapshot()
+    if frame_paths is None:
+        # A single process writing the movie itself; --render-anim honors
+        # the scene's frame step
+        commands = [blender_render_command(
+            bpy.app.binary_path, snapshot, frame_output, scene.frame_start, scene.frame_end, scene=scene.name,
+        )]
+    else:
+        # Explicit frame lists, so chunks keep the frame step
+        commands = [
+            blender_render_command(
+                bpy.app.binary_path, snapshot, frame_output, None, None,
+                scene=scene.name, file_format=file_format, frames=to_render[start:end + 1],
+            )
+            for start, end in split_frames(0, len(to_render) - 1, workers)
+        ]
+    return commands, len(to_render), actual_path, workdir, start_encoder, finalize, len(frames) - len(to_render)
+
+
+@_tool()
+async def render_animation(output_path: str = None, wait: bool = False, workers: int = 1,
+                           use_cache: bool = None, ctx: Context = None):
+    """Render the animation in background Blender processes (uses current render settings)
+    
+    Returns a job id immediately; use render_status to follow progress.
     
     Args:
         output_path: Optional output path to override current settings
+        wait: Wait for the render to finish before returning
+        workers: Number of Blender processes sharing the frame range. MP4 output
+            is rendered as PNG frames by the workers and encoded as they land.
+        use_cache: Skip frames whose scene content is unchanged since their
+            image was last rendered to the same output (default: on for
+            image sequences, off for MP4, where it needs ffmpeg)
+    """
+    commands, total_frames, actual_path, workdir, start_encoder, finalize, cached = await _in_session(
+        functools.partial(_prepare_render, output_path, workers, use_cache)
+    )
+    job = RenderJob(commands, total_frames, actual_path, workdir=workdir, finalize=finalize, cached_frames=cached)
+    _RENDER_JOBS[job.id] = job
+    
+    # Progress notifications are only valid while the request is open
+    report_progress = None
+    if wait and ctx is not None:
+        async def report_progress(job):
+            await ctx.report_progress(
+                job.frames_done, job.total_frames, message=f"Render {job.id}: {job.status}"
+            )
+        job.add_listener(report_progress)
+    
+    job.start()
+    if start_encoder:
+        start_encoder(job)
+    if not wait:
+        reused = f" ({cached} unchanged frames reused)" if cached else ""
+        return f"Render job {job.id} started: {total_frames} frames on {len(commands)} worker(s){reused} -> {actual_path}. Use render_status to track progress."
+    
+    try:
+        await job.wait()
+    finally:
+        if report_progress:
+            job.remove_listener(report_progress)
+    return json.dumps(job.to_dict())
+
+@contextlib.contextmanager
+def _override_settings(settings):
+    """Temporarily set (owner, attribute, value) settings, restoring them on exit"""
+    previous = [(owner, attr, getattr(owner, attr)) for owner, attr, _ in settings]
+    try:
+        for owner, attr, value in settings:
+            setattr(owner, attr, value)
+        yield
+    finally:
+        for owner, attr, value in reversed(previous):
+            setattr(owner, attr, value)
+
+
+def _preview_settings(scene, resolution_percentage, engine):
+    """Fast, low-resolution render settings for _override_settings"""
+    render = scene.render
+    engines = bpy.types.RenderSettings.bl_rna.properties["engine"].enum_items.keys()
+    settings = [
+        (render, "resolution_percentage", max(1, min(int(resolution_percentage), 100))),
+        (render, "use_simplify", True),
+        (render, "simplify_subdivision_render", 0),
+        (render.image_settings, "file_format", 'PNG'),
+    ]
+    if engine.upper() == "EEVEE":
+        # Named BLENDER_EEVEE_NEXT in some versions
+        eevee = next((name for name in engines if name.startswith("BLENDER_EEVEE")), "BLENDER_EEVEE")
+        settings += [(render, "engine", eevee), (scene.eevee, "taa_render_samples", 4)]
+    else:
+        settings += [
+            (render, "engine", "BLENDER_WORKBENCH"),
+            (scene.display, "render_aa", 'FXAA'),
+            (scene.display.shading, "color_type", 'MATERIAL'),
+        ]
+    return settings
+
+
+def _prepare_preview(output_path, max_frames, resolution_percentage, engine, format, workers):
+    """Snapshot the scene with preview settings and build the worker commands
+    
+    Returns:
+        (commands, frames rendered, preview path, workdir, finalize) tuple
     """
+    scene = bpy.context.scene
+    frames = list(range(scene.frame_start, scene.frame_end + 1, scene.frame_step))
+    step = max(1, math.ceil(len(frames) / max(1, max_frames)))
+    frames = frames[::step]
+    
+    extension = ".gif" if format.upper() == "GIF" else ".png"
     if output_path:
-        bpy.context.scene.render.filepath = output_path
+        preview_path = os.path.abspath(bpy.path.abspath(output_path))
+    else:
+        preview_path = os.path.join(tempfile.gettempdir(), f"blender_mcp_preview_{scene.name}{extension}")
+    if not preview_path.lower().endswith(extension):
+        preview_path += extension
+    # Keep the playback speed of the full animation
+    fps = max(1, round(scene.render.fps / (scene.frame_step * step)))
     
-    bpy.ops.render.render(animation=True)
+    with _override_settings(_preview_settings(scene, resolution_percentage, engine)):
+        workdir, snapshot = _save_snapshot()
+    frame_output = os.path.join(workdir, "frame_")
+    frame_paths = [f"{frame_output}{frame:04d}.png" for frame in frames]
+    commands = [
+        blender_render_command(
+            bpy.app.binary_path, snapshot, frame_output, None, None,
+            scene=scene.name, file_format="PNG", frames=frames[start:end + 1],
+        )
+        for start, end in split_frames(0, len(frames) - 1, workers)
+    ]
     
-    actual_path = bpy.context.scene.render.filepath
-    return f"Animation rendering started! Output: {actual_path}"
+    async def finalize(job):
+        def build():
+            # Keep convert_to_mp4's messages off the MCP stdout
+            log = io.StringIO()
+            ok = preview_from_frames(frame_paths, preview_path, fps=fps, report=log)
+            return None if ok else f"Preview failed: {log.getvalue().strip()[-500:]}"
+        return await asyncio.to_thread(build)
+    return commands, len(frames), preview_path, workdir, finalize
 
-@mcp.tool()
+
+@_tool()
+async def render_preview(output_path: str = None, max_frames: int = 16, resolution_percentage: int = 25,
+                         engine: str = "WORKBENCH", format: str = "GIF", workers: int = 1,
+                         wait: bool = True, ctx: Context = None):
+    """Quickly render a low-resolution preview of the animation as a GIF or contact sheet
+    
+    Renders an evenly spaced subset of the frames with fast settings; the
+    scene's own render settings are left unchanged.
+    
+    Args:
+        output_path: Preview file (default: a file in the temp folder)
+        max_frames: Most frames to render; every Nth frame is used beyond this
+        resolution_percentage: Scale of the scene resolution (1-100)
+        engine: 'WORKBENCH' (fastest, solid colors) or 'EEVEE' (low samples)
+        format: 'GIF' for a looping animation, 'SHEET' for a PNG contact sheet
+        workers: Number of Blender processes sharing the frames
+        wait: Wait for the preview before returning (default true)
+    """
+    commands, total_frames, preview_path, workdir, finalize = await _in_session(functools.partial(
+        _prepare_preview, output_path, max_frames, resolution_percentage, engine, format, workers
+    ))
+    job = RenderJob(commands, total_frames, preview_path, workdir=workdir, finalize=finalize)
+    _RENDER_JOBS[job.id] = job
+    
+    # Progress notifications are only valid while the request is open
+    report_progress = None
+    if wait and ctx is not None:
+        async def report_progress(job):
+            await ctx.report_progress(
+                job.frames_done, job.total_frames, message=f"Preview {job.id}: {job.status}"
+            )
+        job.add_listener(report_progress)
+    
+    job.start()
+    if not wait:
+        return f"Preview job {job.id} started: {total_frames} frames -> {preview_path}. Use render_status to track progress."
+    
+    try:
+        await job.wait()
+    finally:
+        if report_progress:
+            job.remove_listener(report_progress)
+    return json.dumps(job.to_dict())
+
+@_tool()
+def render_frame(frame: int = None, max_dimension: int = 512, format: str = "PNG", quality: int = 80,
+                 engine: str = None):
+    """Render one frame and return it as an image, without leaving files behind
+    
+    Args:
+        frame: Frame to render (default: the current frame)
+        max_dimension: Longest side of the image in pixels (the scene
+            resolution is scaled down to fit, never up)
+        format: 'PNG', 'JPEG' or 'WEBP'
+        quality: JPEG/WebP quality (1-100)
+        engine: Optional 'WORKBENCH' or 'EEVEE' for a fast low-sample render
+            instead of the scene's engine
+    """
+    scene = bpy.context.scene
+    if scene.camera is None:
+        return "Error: The scene has no camera; call setup_2d_camera first"
+    file_format = {"JPG": "JPEG"}.get(format.upper(), format.upper())
+    if file_format not in ("PNG", "JPEG", "WEBP"):
+        return f"Error: Unsupported image format '{format}' (use PNG, JPEG or WEBP)"
+    
+    render = scene.render
+    longest = max(render.resolution_x, render.resolution_y)
+    percentage = max(1, min(100, int(max_dimension * 100 / longest)))
+    settings = _preview_settings(scene, percentage, engine) if engine else [
+        (render, "resolution_percentage", percentage),
+    ]
+    settings += [
+        (render.image_settings, "file_format", file_format),
+        (render.image_settings, "color_mode", 'RGB' if file_format == "JPEG" else 'RGBA'),
+        (render.image_settings, "quality", max(1, min(int(quality), 100))),
+    ]
+    if file_format == "PNG":
+        settings.append((render.image_settings, "compression", 15))  # Favor speed over size
+    
+    # Render Result has no pixel buffer in background mode, so the image
+    # goes through a temp file written with the settings above
+    handle, path = tempfile.mkstemp(prefix="blender_mcp_frame_", suffix="." + file_format.lower())
+    os.close(handle)
+    current = scene.frame_current
+    try:
+        with _override_settings(settings):
+            if frame is not None:
+                scene.frame_set(frame)
+            with _METRICS.ops():
+                bpy.ops.render.render()
+            bpy.data.images["Render Result"].save_render(filepath=path, scene=scene)
+        with open(path, "rb") as f:
+            data = f.read()
+    finally:
+        if scene.frame_current != current:
+            scene.frame_set(current)
+        os.remove(path)
+    return Image(data=data, format=file_format.lower())
+
+# Job bookkeeping tools don't touch bpy; being async keeps them off the
+# main-thread queue, so they answer even while long bpy work is running
+@_tool()
+async def render_status(job_id: str = None):
+    """Report progress of render jobs
+    
+    Args:
+        job_id: Job to report on (all jobs if omitted)
+    """
+    if job_id is None:
+        return json.dumps([job.to_dict() for job in _RENDER_JOBS.values()])
+    
+    job = _RENDER_JOBS.get(job_id)
+    if not job:
+        return f"Error: Render job '{job_id}' not found"
+    return json.dumps(job.to_dict())
+
+@_tool()
+async def cancel_render(job_id: str):
+    """Stop a running render job
+    
+    Args:
+        job_id: Job to cancel
+    """
+    # Runs on the transport's event loop, which owns the job's processes
+    job = _RENDER_JOBS.get(job_id)
+    if not job:
+        return f"Error: Render job '{job_id}' not found"
+    if not job.cancel():
+        return f"Render job {job_id} already {job.status}"
+    return f"Render job {job_id} cancelled after {job.frames_done}/{job.total_frames} frames"
+
+@_tool()
 def add_light(light_type: str = "SUN", location: list = None, energy: float = 1.0):
     """Add a light to the scene
     
@@ -295,13 +1516,13 @@ def add_light(light_type: str = "SUN", location: list = None, energy: float = 1.
     if location is None:
         location = [0, 0, 5]
     
-    bpy.ops.object.light_add(type=light_type, location=location)
-    light = bpy.context.active_object
-    light.data.energy = energy
+    light_data = bpy.data.lights.new(light_type.capitalize(), type=light_type)
+    light_data.energy = energy
+    _link_object(light_type.capitalize(), light_data, location)
     
     return f"{light_type} light added at {location} with energy {energy}"
 
-@mcp.tool()
+@_tool()
 def set_background_color(color: list = None):
     """Set the world background color
     
@@ -312,6 +1533,10 @@ def set_background_color(color: list = None):
         color = [0.05, 0.05, 0.05]  # Dark gray
     
     world = bpy.context.scene.world
+    if world is None:
+        # Scenes made for MCP sessions start without a world
+        world = bpy.context.scene.world = bpy.data.worlds.new("World")
+        world.use_nodes = True
     if world.use_nodes:
         bg_node = world.node_tree.nodes.get('Background')
         if bg_node:
@@ -321,26 +1546,31 @@ def set_background_color(color: list = None):
 
 # ========== MESH-BASED 2D ANIMATION TOOLS (Alternative to Grease Pencil) ==========
 
-@mcp.tool()
-def create_2d_circle(name: str = "Circle", radius: float = 1.0, location: list = None):
+@_tool()
+def create_2d_circle(name: str = "Circle", radius: float = 1.0, location: list = None, vertices: int = 32, instance: bool = False):
     """Create a 2D circle mesh for animation
     
     Args:
         name: Object name
         radius: Circle radius
         location: Location [x, y, z]
+        vertices: Number of vertices around the circle
+        instance: Reuse one shared mesh for every circle with the same radius and vertices
     """
     if location is None:
         location = [0, 0, 0]
     
-    bpy.ops.mesh.primitive_circle_add(radius=radius, location=location, fill_type='NGON')
-    obj = bpy.context.active_object
-    obj.name = name
+    if instance:
+        key = ("circle", float(radius), int(vertices))
+        mesh = _shared_mesh(key, lambda: _circle_mesh(f"Circle_r{radius}_v{vertices}", radius, vertices))
+    else:
+        mesh = _circle_mesh(name, radius, vertices)
+    _link_object(name, mesh, location)
     
     return f"2D circle '{name}' created at {location} with radius {radius}"
 
-@mcp.tool()
-def create_2d_rectangle(name: str = "Rectangle", width: float = 2.0, height: float = 1.0, location: list = None):
+@_tool()
+def create_2d_rectangle(name: str = "Rectangle", width: float = 2.0, height: float = 1.0, location: list = None, instance: bool = False):
     """Create a 2D rectangle mesh for animation
     
     Args:
@@ -348,18 +1578,56 @@ def create_2d_rectangle(name: str = "Rectangle", width: float = 2.0, height: flo
         width: Rectangle width
         height: Rectangle height
         location: Location [x, y, z]
+        instance: Reuse one shared unit plane mesh (size comes from object scale)
     """
     if location is None:
         location = [0, 0, 0]
     
-    bpy.ops.mesh.primitive_plane_add(size=1, location=location)
-    obj = bpy.context.active_object
-    obj.name = name
+    if instance:
+        mesh = _shared_mesh(("plane", 1.0), lambda: _plane_mesh("Plane_unit", size=1))
+    else:
+        mesh = _plane_mesh(name, size=1)
+    obj = _link_object(name, mesh, location)
     obj.scale = [width/2, height/2, 1]
     
     return f"2D rectangle '{name}' created at {location} with size {width}x{height}"
 
-@mcp.tool()
+@_tool()
+def create_instances(source_object: str, locations: list, name_prefix: str = None):
+    """Place many copies of an object that all share its geometry
+    
+    Args:
+        source_object: Name of the object to copy
+        locations: List of [x, y, z] positions, one per copy
+        name_prefix: Name prefix for the copies (defaults to the source name)
+    """
+    source = _get_object(source_object)
+    if not source:
+        return f"Error: Object '{source_object}' not found"
+    
+    coords = np.asarray(locations, dtype=np.float64)
+    if coords.size and (coords.ndim != 2 or coords.shape[1] != 3):
+        return "Error: Each location must have [x, y, z]"
+    
+    prefix = name_prefix or source.name
+    collection = bpy.context.scene.collection
+    slot_material = None
+    if source.material_slots and source.material_slots[0].link == 'OBJECT':
+        slot_material = source.material_slots[0].material
+    
+    for i, location in enumerate(coords):
+        obj = bpy.data.objects.new(f"{prefix}_{i}", source.data)
+        obj.location = location
+        obj.rotation_euler = source.rotation_euler
+        obj.scale = source.scale
+        collection.objects.link(obj)
+        _note_alias(f"{prefix}_{i}", obj)
+        if slot_material is not None:
+            _assign_material(obj, slot_material)
+    
+    return f"Created {len(coords)} instances of '{source_object}'"
+
+@_tool()
 def set_object_material(object_name: str, color: list = None, alpha: float = 1.0):
     """Create and assign a material to an object
     
@@ -371,60 +1639,487 @@ def set_object_material(object_name: str, color: list = None, alpha: float = 1.0
     if color is None:
         color = [0.8, 0.8, 0.8]
     
-    obj = bpy.data.objects.get(object_name)
+    obj = _get_object(object_name)
     if not obj:
         return f"Error: Object '{object_name}' not found"
     
-    # Create material
-    mat_name = f"{object_name}_Material"
-    mat = bpy.data.materials.new(mat_name)
-    mat.use_nodes = True
-    
-    # Get the Principled BSDF node
-    bsdf = mat.node_tree.nodes.get('Principled BSDF')
-    if bsdf:
-        bsdf.inputs['Base Color'].default_value = (*color, 1.0)
-        bsdf.inputs['Alpha'].default_value = alpha
-        
-        # Enable transparency if alpha < 1
-        if alpha < 1.0:
-            mat.blend_method = 'BLEND'
+    # Reuse an identical material if one exists
+    mat, _ = _cached_material("surface", color, alpha, lambda: _build_surface_material(color, alpha))
     
     # Assign material to object
-    if obj.data.materials:
-        obj.data.materials[0] = mat
-    else:
-        obj.data.materials.append(mat)
+    _assign_material(obj, mat)
     
     return f"Material assigned to '{object_name}' with color {color}"
 
-@mcp.tool()
-def animate_object_location(object_name: str, keyframes: list):
+@_tool()
+def assign_materials(assignments: list, purge_orphans: bool = False):
+    """Color many objects in one call, sharing one material per distinct color
+    
+    Args:
+        assignments: List of {"object_name": str, "color": [r, g, b], "alpha": float}
+        purge_orphans: Remove materials left without users afterwards
+    """
+    created = 0
+    missing = []
+    for item in assignments:
+        obj = _get_object(item.get("object_name", ""))
+        if not obj:
+            missing.append(item.get("object_name"))
+            continue
+        
+        color = item.get("color") or [0.8, 0.8, 0.8]
+        alpha = item.get("alpha", 1.0)
+        mat, is_new = _cached_material("surface", color, alpha, lambda: _build_surface_material(color, alpha))
+        created += is_new
+        _assign_material(obj, mat)
+    
+    result = f"Assigned materials to {len(assignments) - len(missing)} objects ({created} new materials)"
+    if purge_orphans:
+        result += f", purged {_purge_orphan_materials()} unused materials"
+    if missing:
+        result += f". Not found: {', '.join(map(str, missing))}"
+    return result
+
+@_tool()
+def purge_unused_materials():
+    """Delete materials that are no longer assigned to anything"""
+    return f"Purged {_purge_orphan_materials()} unused materials"
+
+@_tool()
+def animate_object_location(object_name: str, keyframes: list, tolerance: float = 0.0):
     """Animate an object's location with keyframes
     
     Args:
         object_name: Name of the object to animate
         keyframes: List of [frame, x, y, z] values
+        tolerance: If above 0, drop keys the remaining ones reproduce within
+            this distance (per axis); kept keys use linear interpolation
     """
-    obj = bpy.data.objects.get(object_name)
+    obj = _get_object(object_name)
     if not obj:
         return f"Error: Object '{object_name}' not found"
     
-    for keyframe in keyframes:
-        if len(keyframe) != 4:
-            return f"Error: Each keyframe must have [frame, x, y, z]"
+    if any(len(keyframe) != 4 for keyframe in keyframes):
+        return f"Error: Each keyframe must have [frame, x, y, z]"
+    
+    if not keyframes:
+        return f"Added 0 location keyframes to '{object_name}'"
+    
+    keys = np.asarray(keyframes, dtype=np.float64)
+    frames, values = np.rint(keys[:, 0]), keys[:, 1:]
+    if tolerance <= 0:
+        _insert_keyframes(obj, "location", frames, values)
+        return f"Added {len(keyframes)} location keyframes to '{object_name}'"
+    
+    # Simplify the path as it will play: sorted by frame, later keys winning
+    _, last = np.unique(frames[::-1], return_index=True)
+    frames, values = frames[::-1][last], values[::-1][last]
+    kept = simplify_keyframes(frames, values, tolerance)
+    _insert_keyframes(obj, "location", frames[kept], values[kept], interpolation='LINEAR')
+    return f"Added {len(kept)} location keyframes to '{object_name}' ({len(keyframes)} in, {len(kept)} out at tolerance {tolerance})"
+
+
+@_tool()
+def generate_bounce_animation(object_names: list, start_frame: int = 1, end_frame: int = None, floor: float = -2.0,
+                              gravity: float = 9.81, restitution: float = 0.7, horizontal_speed: float = 0.0,
+                              squash: float = 0.3, stretch: float = 0.15):
+    """Drop objects from their current positions and let them bounce on a floor
+    
+    Computes a physical trajectory for every object at once and writes
+    location and squash/stretch scale keys for every frame in bulk.
+    
+    Args:
+        object_names: Objects to animate (their current y is the drop height)
+        start_frame: Frame the drop starts
+        end_frame: Last frame (defaults to the scene's end frame)
+        floor: Height of the floor surface; objects land on their bottom edge
+        gravity: Downward acceleration in units per second squared
+        restitution: Fraction of speed kept at each bounce (0-1)
+        horizontal_speed: Sideways speed along x, in units per second
+        squash: How much objects flatten at the hardest impact (0 disables)
+        stretch: How much objects stretch at full speed (0 disables)
+    """
+    objects = [_get_object(name) for name in object_names]
+    missing = [name for name, obj in zip(object_names, objects) if obj is None]
+    if missing:
+        return f"Error: Object(s) not found: {', '.join(missing)}"
+    
+    scene = bpy.context.scene
+    if end_frame is None:
+        end_frame = scene.frame_end
+    if end_frame <= start_frame:
+        return "Error: end_frame must be after start_frame"
+    
+    fps = scene.render.fps / scene.render.fps_base
+    frames = np.arange(start_frame, end_frame + 1, dtype=np.float64)
+    times = (frames - start_frame) / fps
+    
+    start = np.array([tuple(obj.location) for obj in objects], dtype=np.float64)
+    base_scale = np.array([tuple(obj.scale) for obj in objects], dtype=np.float64)
+    half_height = np.array([obj.dimensions[1] / 2 for obj in objects], dtype=np.float64)
+    contact = floor + half_height
+    
+    y, vy, since, until, impact_speed = bounce_trajectory(start[:, 1], contact, times, gravity, restitution)
+    sx, sy = squash_stretch(vy, since, until, impact_speed, impact_speed[:, 0], 1 / fps, squash, stretch)
+    # Squashed objects stay on the floor instead of sinking into it
+    y = np.where(sy < 1, np.minimum(y, contact[:, None] - (1 - sy) * half_height[:, None]), y)
+    x = start[:, :1] + horizontal_speed * times[None, :]
+    
+    for i, obj in enumerate(objects):
+        location = np.column_stack((x[i], y[i], np.full_like(times, start[i, 2])))
+        _insert_keyframes(obj, "location", frames, location)
+        if squash or stretch:
+            scale = base_scale[i] * np.column_stack((sx[i], sy[i], np.ones_like(times)))
+            _insert_keyframes(obj, "scale", frames, scale)
+    
+    return f"Bounce animation on {len(objects)} object(s), frames {start_frame}-{end_frame} ({len(frames)} keys each)"
+
+
+# ========== SCENE STATE ==========
+# A depsgraph_update_post handler records which objects changed at which
+# revision, so get_scene_state(since=token) only serialises the changes.
+# Tokens carry a session id; a token from before a reset (or from another
+# pooled client) gets a full snapshot instead of a bogus diff. Each scene
+# has its own tracker, since every HTTP session works in its own scene.
+
+class _SceneTracker:
+    """Revision counter and per-object change log fed by depsgraph updates"""
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        self.session = f"{random.getrandbits(32):08x}"
+        self.revision = 0
+        self.changed = {}  # object name -> revision of its last change
+        self.removed = {}  # object name -> revision it disappeared
+        self.dirty_data = set()  # (kind, name) of materials/actions edited since the last query
+        self.membership_dirty = True
+        self.names = set()
+    
+    def token(self):
+        return f"{self.session}:{self.revision}"
+    
+    def parse(self, token):
+        """Revision encoded in token, or None if it belongs to another session"""
+        session, _, revision = (token or "").partition(":")
+        if session != self.session or not revision.isdigit():
+            return None
+        return int(revision)
+    
+    def on_update(self, depsgraph):
+        touched = False
+        for update in depsgraph.updates:
+            data = update.id.original
+            if isinstance(data, bpy.types.Object):
+                self.changed[data.name] = self.revision + 1
+            elif isinstance(data, (bpy.types.Material, bpy.types.Action)):
+                self.dirty_data.add((type(data).__name__, data.name))
+            elif isinstance(data, (bpy.types.Scene, bpy.types.Collection)):
+                self.membership_dirty = True
+            else:
+                continue
+            touched = True
+        if touched:
+            self.revision += 1
+    
+    def sync(self, scene):
+        """Fold pending material/action edits and added/removed objects into the log"""
+        if self.dirty_data:
+            revision = self.revision + 1
+            for obj in scene.objects:
+                action = obj.animation_data.action if obj.animation_data else None
+                if action and ("Action", action.name) in self.dirty_data:
+                    self.changed[obj.name] = revision
+                elif any(slot.material and ("Material", slot.material.name) in self.dirty_data for slot in obj.material_slots):
+                    self.changed[obj.name] = revision
+            self.dirty_data.clear()
+            self.revision = revision
         
-        frame, x, y, z = keyframe
-        bpy.context.scene.frame_set(int(frame))
-        obj.location = (x, y, z)
-        obj.keyframe_insert(data_path="location", frame=int(frame))
+        if self.membership_dirty or len(scene.objects) != len(self.names):
+            names = set(scene.objects.keys())
+            added, gone = names - self.names, self.names - names
+            if added or gone:
+                self.revision += 1
+                for name in added:
+                    self.changed[name] = self.revision
+                    self.removed.pop(name, None)
+                for name in gone:
+                    self.removed[name] = self.revision
+                    self.changed.pop(name, None)
+            self.names = names
+            self.membership_dirty = False
+
+
+_SCENE_TRACKERS = {}  # scene name -> _SceneTracker
+
+
+def _scene_tracker(scene):
+    """Change log of scene, created on first use"""
+    tracker = _SCENE_TRACKERS.get(scene.name)
+    if tracker is None:
+        tracker = _SCENE_TRACKERS[scene.name] = _SceneTracker()
+    return tracker
+
+
+@bpy.app.handlers.persistent
+def _on_scene_update(scene, depsgraph):
+    _scene_tracker(scene).on_update(depsgraph)
+
+
+bpy.app.handlers.depsgraph_update_post.append(_on_scene_update)
+
+
+def _animation_summary(obj):
+    """(keyframe count, first frame, last frame) of obj's action, or None"""
+    action = obj.animation_data.action if obj.animation_data else None
+    if action is None:
+        return None
+    anim = obj.animation_data
+    # Layered actions (Blender 4.4+; 5.0 removed Action.fcurves) keep
+    # F-curves in a per-slot channelbag
+    if hasattr(anim, "action_slot"):
+        from bpy_extras import anim_utils
+        channelbag = anim_utils.action_get_channelbag_for_slot(action, anim.action_slot) if anim.action_slot else None
+        fcurves = channelbag.fcurves if channelbag else []
+    else:
+        fcurves = action.fcurves
+    keys = sum(len(fcurve.keyframe_points) for fcurve in fcurves)
+    if not keys:
+        return None
+    start, end = action.frame_range
+    return keys, int(start), int(end)
+
+
+def _columns(objects, vectors=None):
+    """Columnar encoding of objects: parallel lists plus type/material tables
+    
+    Args:
+        objects: Objects to encode, in order
+        vectors: Optional {"location": array, ...} already read with
+            foreach_get for exactly these objects
+    """
+    types, materials = {}, {}
+    columns = {"name": [], "type": [], "material": [], "keyframes": [], "frame_range": []}
+    for obj in objects:
+        columns["name"].append(obj.name)
+        columns["type"].append(types.setdefault(obj.type, len(types)))
+        material = obj.active_material
+        columns["material"].append(materials.setdefault(material.name, len(materials)) if material else -1)
+        summary = _animation_summary(obj)
+        columns["keyframes"].append(summary[0] if summary else 0)
+        columns["frame_range"].append([summary[1], summary[2]] if summary else None)
+    
+    if vectors is None:
+        vectors = {
+            prop: np.array([tuple(getattr(obj, prop)) for obj in objects], dtype=np.float32).reshape(-1, 3)
+            for prop in ("location", "rotation_euler", "scale")
+        }
+    # Flat [x0, y0, z0, x1, ...] per transform channel
+    for prop, key in (("location", "location"), ("rotation_euler", "rotation"), ("scale", "scale")):
+        columns[key] = np.round(vectors[prop].ravel().astype(np.float64), 4).tolist()
+    
+    return {"types": list(types), "materials": list(materials), "objects": columns}
+
+
+@_tool()
+def get_scene_state(since: str = None):
+    """Describe the scene: objects, transforms, materials, animation and timeline
+    
+    Objects come back in a columnar encoding: parallel lists under
+    "objects" (name, type index, material index or -1, keyframe count,
+    animation frame range, and flat xyz triples for location, rotation and
+    scale), with the "types" and "materials" tables they index into.
+    
+    Args:
+        since: Revision token from an earlier call. Only objects changed
+            since then are returned, plus the names of removed objects.
+            Omit it (or pass an expired token) for a full snapshot.
+    """
+    scene = bpy.context.scene
+    # Flush pending edits so the depsgraph handler has seen them
+    bpy.context.view_layer.update()
+    tracker = _scene_tracker(scene)
+    tracker.sync(scene)
+    
+    since_revision = tracker.parse(since)
+    state = {
+        "revision": tracker.token(),
+        "full": since_revision is None,
+        "frame_range": [scene.frame_start, scene.frame_end],
+        "fps": scene.render.fps,
+        "camera": scene.camera.name if scene.camera else None,
+    }
     
-    return f"Added {len(keyframes)} location keyframes to '{object_name}'"
+    if since_revision is None:
+        count = len(scene.objects)
+        vectors = {}
+        for prop in ("location", "rotation_euler", "scale"):
+            values = np.empty(count * 3, dtype=np.float32)
+            scene.objects.foreach_get(prop, values)
+            vectors[prop] = values.reshape(-1, 3)
+        state.update(_columns(list(scene.objects), vectors))
+    else:
+        changed = [
+            scene.objects[name] for name, revision in tracker.changed.items()
+            if revision > since_revision and name in scene.objects
+        ]
+        state.update(_columns(changed))
+        state["removed"] = [name for name, revision in tracker.removed.items() if revision > since_revision]
+    
+    return json.dumps(state, separators=(",", ":"))
+
+
+# Async so the report isn't itself stuck behind the work it describes
+@_tool()
+async def get_queue_stats():
+    """Report the main-thread work queue: depth, wait times and burst sizes"""
+    return json.dumps(_WORK_QUEUE.stats())
+
+
+# ========== BATCH EXECUTION ==========
+
+def _resolve_refs(value, created):
+    """Replace "$id" strings with the name of the object created by that batch op"""
+    if isinstance(value, str) and value.startswith("$"):
+        ref = value[1:]
+        if ref not in created:
+            raise KeyError(f"unknown reference '{value}'")
+        return created[ref]
+    if isinstance(value, list):
+        return [_resolve_refs(v, created) for v in value]
+    if isinstance(value, dict):
+        return {k: _resolve_refs(v, created) for k, v in value.items()}
+    return value
+
+
+def _run_batch_op(fn, args):
+    """Call a sync tool; returns (result, name of the object it created or None)"""
+    global _last_created_object
+    _last_created_object = None
+    result = fn(**args)
+    return result, _last_created_object.name if _last_created_object is not None else None
+
+
+@_tool()
+async def execute_batch(operations: list, stop_on_error: bool = True):
+    """Run several tools in order within a single call
+    
+    Args:
+        operations: List of {"tool": name, "args": {...}, "id": optional label}.
+            Any argument value "$label" is replaced with the name of the object
+            created by the operation carrying that id.
+        stop_on_error: Skip the remaining operations after the first failure
+    """
+    created = {}
+    results = []
+    failed = False
+    
+    for index, op in enumerate(operations):
+        op_id = op.get("id", str(index))
+        tool_name = op.get("tool")
+        entry = {"id": op_id, "tool": tool_name}
+        
+        if failed and stop_on_error:
+            entry.update(ok=False, result="Skipped: earlier operation failed")
+            results.append(entry)
+            continue
+        
+        fn = _TOOL_REGISTRY.get(tool_name)
+        if fn is None or fn is execute_batch:
+            entry.update(ok=False, result=f"Error: Unknown tool '{tool_name}'")
+        else:
+            try:
+                args = _resolve_refs(op.get("args", {}), created)
+                if inspect.iscoroutinefunction(fn):
+                    result, made = await fn(**args), None
+                else:
+                    result, made = await _in_session(functools.partial(_run_batch_op, fn, args))
+                result = str(result)
+                entry.update(ok=not result.startswith("Error"), result=result)
+                if made is not None:
+                    created[op_id] = entry["object"] = made
+            except Exception as e:
+                entry.update(ok=False, result=f"Error: {str(e)}")
+        
+        failed = failed or not entry["ok"]
+        results.append(entry)
+    
+    succeeded = sum(1 for entry in results if entry["ok"])
+    return json.dumps({
+        "completed": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results,
+    })
+
+
+# ========== WARM POOL WORKER ==========
+
+def _reset_session_state():
+    """Return to a fresh factory scene so the next pooled client starts clean"""
+    # The previous client's event loop is gone, but its render processes
+    # are not; stop them before dropping the jobs (their snapshots go too)
+    for job in _RENDER_JOBS.values():
+        with contextlib.suppress(ProcessLookupError, RuntimeError):
+            job.cancel()
+    _RENDER_JOBS.clear()
+    _MESH_CACHE.clear()
+    _MATERIAL_CACHE.clear()
+    _OBJECT_ALIASES.clear()
+    with _METRICS.ops():
+        bpy.ops.wm.read_factory_settings()
+    _SCENE_TRACKERS.clear()
+
+
+def _serve_pool_worker(address):
+    """Serve one MCP client per lease for blender_mcp_launcher's warm pool
+    
+    Connects to the pool daemon, serves MCP over that connection until the
+    daemon closes it, resets the scene and connects again.
+    """
+    import socket
+    import anyio
+    from mcp.server.stdio import stdio_server
+    
+    host, port = address.rsplit(":", 1)
+    
+    async def serve(sock):
+        reader = anyio.wrap_file(sock.makefile("r", encoding="utf-8", newline="\n"))
+        writer = anyio.wrap_file(sock.makefile("w", encoding="utf-8", newline="\n"))
+        async with stdio_server(reader, writer) as (read_stream, write_stream):
+            server = mcp._mcp_server
+            await server.run(read_stream, write_stream, server.create_initialization_options())
+    
+    while True:
+        try:
+            sock = socket.create_connection((host, int(port)))
+        except OSError:
+            return  # Daemon is gone
+        with sock:
+            sock.sendall(f"WORKER {os.getpid()}\n".encode())
+            _serve_on_worker_thread(lambda: anyio.run(serve, sock))
+        _reset_session_state()
 
 
 # IMPORTANT:
 # - No print()
 # - No logging
 # - Only MCP JSON goes to stdout
+# - Diagnostics go through _METRICS (file or stderr, see BLENDER_MCP_METRICS)
 if __name__ == "__main__":
-    mcp.run()
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    if "--pool-worker" in argv:
+        _serve_pool_worker(argv[argv.index("--pool-worker") + 1])
+    elif "--transport" in argv:
+        # blender --background --python blender_mcp_server.py -- --transport sse|streamable-http
+        #     [--host 127.0.0.1] [--port 8000] [--uds /path/to/socket]
+        options = {"--host": "127.0.0.1", "--port": "8000", "--uds": None}
+        for i, arg in enumerate(argv[:-1]):
+            if arg in options:
+                options[arg] = argv[i + 1]
+        _serve_sessions(
+            argv[argv.index("--transport") + 1],
+            options["--host"], int(options["--port"]), options["--uds"],
+        )
+    else:
+        _serve_on_worker_thread(mcp.run)
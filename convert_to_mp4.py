@@ -1,100 +1,417 @@
 """
 Convert PNG image sequence to MP4 video
-Usage: python convert_to_mp4.py <input_folder> <output_file.mp4>
+Usage: python convert_to_mp4.py <input_folder> <output_file.mp4> [--fps 24] [--segments 1]
+       python convert_to_mp4.py --watch <input_folder> <output_file.mp4> --frames 1-240 [--prefix frame_] [--fps 24]
+       python convert_to_mp4.py --benchmark [--frames 240] [--size 1280x720] [--segments 1,2,4]
+
+--segments N splits the sequence into N parts encoded by parallel ffmpeg
+processes and joined without re-encoding. --watch encodes while a render
+is still writing frames: each frame is piped into a running ffmpeg as soon
+as it is complete, so the MP4 is done moments after the last frame.
+--benchmark encodes generated test frames with each segment count and
+reports frames per second.
 """
+import math
+import re
+import shutil
 import subprocess
 import sys
 import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def convert_images_to_mp4(input_folder, output_file, fps=24):
-    """Convert a sequence of PNG images to MP4 video using ffmpeg"""
-    
-    # Check if ffmpeg is available
+# Numbered frames like frame_0001.png: (prefix, digits)
+NUMBERED = re.compile(r"^(.*?)(\d+)\.png$")
+
+# PNG files end with this chunk; a file without it is still being written
+PNG_END = b"IEND\xaeB`\x82"
+
+
+def find_sequence(png_files):
+    """ffmpeg image2 pattern for consecutively numbered frames
+
+    Returns:
+        (pattern, first number) such as ("frame_%04d.png", 1), or None when
+        the names don't form one gap-free, fixed-width sequence
+    """
+    matches = [NUMBERED.match(f.name) for f in png_files]
+    if not all(matches):
+        return None
+    prefix, digits = matches[0].group(1), matches[0].group(2)
+    numbers = [int(m.group(2)) for m in matches]
+    if any(m.group(1) != prefix or len(m.group(2)) != len(digits) for m in matches):
+        return None
+    if numbers != list(range(numbers[0], numbers[0] + len(numbers))):
+        return None
+    return f"{prefix}%0{len(digits)}d.png", numbers[0]
+
+
+def split_sequence(count, segments):
+    """(first index, frame count) of up to `segments` contiguous parts"""
+    segments = max(1, min(segments, count))
+    size, extra = divmod(count, segments)
+    parts, start = [], 0
+    for i in range(segments):
+        length = size + (1 if i < extra else 0)
+        parts.append((start, length))
+        start += length
+    return parts
+
+
+def encode_segment(ffmpeg, png_files, sequence, start, count, output_file, fps, threads=0):
+    """Encode png_files[start:start + count] to an H.264 file
+
+    Numbered sequences are read through the image2 pattern; anything else
+    goes through a concat list of the files.
+
+    Returns:
+        None on success, otherwise ffmpeg's error output
+    """
+    parent_dir = png_files[0].parent
+    if sequence:
+        pattern, first_number = sequence
+        inputs = ['-framerate', str(fps), '-start_number', str(first_number + start), '-i', pattern]
+        file_list_path = None
+    else:
+        # A temp file, so nothing beside the output (like video.txt) is touched
+        handle, file_list_path = tempfile.mkstemp(prefix="mp4_frames_", suffix=".txt")
+        file_list_path = Path(file_list_path)
+        with os.fdopen(handle, 'w') as f:
+            for png_file in png_files[start:start + count]:
+                f.write(f"file '{png_file.resolve().as_posix()}'\n")
+                f.write(f"duration {1/fps}\n")
+        inputs = ['-f', 'concat', '-safe', '0', '-i', str(file_list_path)]
+
+    cmd = [
+        ffmpeg,
+        *inputs,
+        '-frames:v', str(count),
+        '-c:v', 'libx264',
+        '-pix_fmt', 'yuv420p',
+        '-crf', '23',
+        '-r', str(fps),
+        '-threads', str(threads),
+        '-y',  # Overwrite output file
+        str(output_file)
+    ]
     try:
-        subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
+        result = subprocess.run(cmd, capture_output=True, text=True, cwd=str(parent_dir))
+    finally:
+        if file_list_path:
+            file_list_path.unlink(missing_ok=True)
+    return None if result.returncode == 0 else result.stderr
+
+
+def convert_images_to_mp4(input_folder, output_file, fps=24, segments=1):
+    """Convert a sequence of PNG images to MP4 video using ffmpeg
+
+    Args:
+        input_folder: Folder holding the PNG frames
+        output_file: MP4 file to write
+        fps: Frame rate of the video
+        segments: Parts encoded in parallel and joined without re-encoding
+    """
+
+    # Check if ffmpeg is available
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
         print("❌ Error: ffmpeg is not installed or not in PATH")
         print("\nTo install ffmpeg:")
         print("1. Download from: https://ffmpeg.org/download.html")
         print("2. Or use: winget install ffmpeg")
         print("3. Or use: choco install ffmpeg")
         return False
-    
-    # Find the pattern for input files
-    input_pattern = os.path.join(input_folder, "*.png")
-    
+
     # Check if files exist
-    png_files = list(Path(input_folder).glob("*.png"))
+    png_files = sorted(Path(input_folder).glob("*.png"))
     if not png_files:
         print(f"❌ Error: No PNG files found in {input_folder}")
         return False
-    
+
     print(f"✅ Found {len(png_files)} PNG files")
-    
-    # Sort files to ensure correct order
-    png_files.sort()
-    first_file = png_files[0]
-    
-    # Determine the input pattern for ffmpeg
-    # If files are named like frame_0001.png, frame_0002.png, etc.
-    parent_dir = first_file.parent
-    
-    # Create a pattern - ffmpeg expects %04d for 4-digit numbers
-    # We'll use a file list instead for more reliability
-    file_list_path = parent_dir / "file_list.txt"
-    with open(file_list_path, 'w') as f:
-        for png_file in png_files:
-            f.write(f"file '{png_file.name}'\n")
-            f.write(f"duration {1/fps}\n")
-    
-    print(f"🎬 Converting to MP4 at {fps} fps...")
-    
-    # FFmpeg command
-    cmd = [
-        'ffmpeg',
-        '-f', 'concat',
-        '-safe', '0',
-        '-i', str(file_list_path),
-        '-c:v', 'libx264',
-        '-pix_fmt', 'yuv420p',
-        '-crf', '23',
-        '-y',  # Overwrite output file
-        str(output_file)
-    ]
-    
+
+    # Numbered frames (frame_0001.png, ...) are read directly as a pattern;
+    # other names fall back to a concat list
+    sequence = find_sequence(png_files)
+    parts = split_sequence(len(png_files), segments)
+    output_file = os.path.abspath(output_file)
+
+    print(f"🎬 Converting to MP4 at {fps} fps ({len(parts)} segment(s))...")
+    start_time = time.perf_counter()
+
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=str(parent_dir))
-        
-        if result.returncode == 0:
+        if len(parts) == 1:
+            error = encode_segment(ffmpeg, png_files, sequence, 0, len(png_files), output_file, fps)
+        else:
+            workdir = tempfile.mkdtemp(prefix="mp4_segments_", dir=os.path.dirname(output_file))
+            try:
+                segment_files = [os.path.join(workdir, f"segment_{i:03d}.mp4") for i in range(len(parts))]
+                # Each ffmpeg gets a share of the cores instead of all of them
+                threads = max(1, (os.cpu_count() or 1) // len(parts))
+                with ThreadPoolExecutor(max_workers=len(parts)) as pool:
+                    errors = list(pool.map(
+                        lambda job: encode_segment(ffmpeg, png_files, sequence, *job, fps, threads),
+                        [(start, count, path) for (start, count), path in zip(parts, segment_files)],
+                    ))
+                error = next((e for e in errors if e), None)
+
+                if error is None:
+                    # Same codec settings in every part, so they join by stream copy
+                    list_path = os.path.join(workdir, "segments.txt")
+                    with open(list_path, 'w') as f:
+                        f.writelines(f"file '{Path(path).as_posix()}'\n" for path in segment_files)
+                    result = subprocess.run(
+                        [ffmpeg, '-f', 'concat', '-safe', '0', '-i', list_path, '-c', 'copy', '-y', output_file],
+                        capture_output=True, text=True,
+                    )
+                    error = None if result.returncode == 0 else result.stderr
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+        if error is None:
+            elapsed = time.perf_counter() - start_time
             print(f"✅ Video created successfully: {output_file}")
             print(f"📁 File size: {os.path.getsize(output_file) / (1024*1024):.2f} MB")
-            
-            # Clean up file list
-            file_list_path.unlink()
+            print(f"⏱️  Encoded {len(png_files)} frames in {elapsed:.2f}s ({len(png_files) / elapsed:.1f} frames/s)")
             return True
         else:
             print(f"❌ Error during conversion:")
-            print(result.stderr)
+            print(error)
             return False
-            
+
     except Exception as e:
         print(f"❌ Error: {e}")
         return False
 
+
+def encode_while_rendering(frame_paths, output_file, fps=24, stop=None, done=None, poll_interval=0.05,
+                           timeout=None, report=None):
+    """Encode frames into an MP4 as they appear on disk
+
+    Frames are piped in order into one ffmpeg process reading PNGs from
+    stdin (image2pipe). Each frame is sent once its file is complete, so
+    encoding overlaps with rendering.
+
+    Args:
+        frame_paths: Frame files in playback order (they may not exist yet)
+        output_file: MP4 file to write
+        fps: Frame rate of the video
+        stop: Optional threading.Event; setting it abandons the encode
+        done: Optional threading.Event set once nothing more will be
+            written; a frame still missing then fails the encode
+        poll_interval: Seconds between checks for the next frame
+        timeout: Give up if a frame takes longer than this to appear
+        report: Stream for progress and error messages (default: stdout)
+
+    Returns:
+        True if the video was written
+    """
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        print("❌ Error: ffmpeg is not installed or not in PATH", file=report)
+        return False
+
+    cmd = [
+        ffmpeg,
+        '-f', 'image2pipe',
+        '-framerate', str(fps),
+        '-c:v', 'png',
+        '-i', '-',
+        '-c:v', 'libx264',
+        '-pix_fmt', 'yuv420p',
+        '-crf', '23',
+        '-y',  # Overwrite output file
+        str(output_file)
+    ]
+    print(f"👀 Waiting for {len(frame_paths)} frames to encode at {fps} fps...", file=report)
+    with tempfile.TemporaryFile() as log:
+        process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=log)
+        try:
+            for path in frame_paths:
+                waited = 0.0
+                while True:
+                    if stop is not None and stop.is_set():
+                        print("⏹️  Encoding stopped", file=report)
+                        return False
+                    # Checked before reading, so a frame finished just before
+                    # the renderers exited is still picked up
+                    finished = done is not None and done.is_set()
+                    try:
+                        with open(path, 'rb') as f:
+                            data = f.read()
+                        if data.endswith(PNG_END):
+                            break
+                    except FileNotFoundError:
+                        pass
+                    if finished:
+                        print(f"❌ Error: Rendering finished without writing {path}", file=report)
+                        return False
+                    if timeout is not None and waited >= timeout:
+                        print(f"❌ Error: Timed out waiting for {path}", file=report)
+                        return False
+                    time.sleep(poll_interval)
+                    waited += poll_interval
+                process.stdin.write(data)
+            last_frame_at = time.perf_counter()
+            process.stdin.close()
+            returncode = process.wait()
+        except (BrokenPipeError, OSError) as e:
+            returncode = process.wait()
+            print(f"❌ Error: ffmpeg stopped reading frames ({e})", file=report)
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+        if returncode != 0:
+            log.seek(0)
+            print(f"❌ Error during conversion:", file=report)
+            print(log.read().decode('utf-8', 'replace')[-2000:], file=report)
+            return False
+
+    print(f"✅ Video created successfully: {output_file}", file=report)
+    print(f"⏱️  Finished {time.perf_counter() - last_frame_at:.2f}s after the last frame", file=report)
+    return True
+
+
+def preview_from_frames(frame_paths, output_file, fps=12, columns=None, report=None):
+    """Build a looping GIF or a contact sheet from finished PNG frames
+
+    The frames are piped into a single ffmpeg run, so they need not be
+    numbered consecutively (a preview usually renders every Nth frame).
+
+    Args:
+        frame_paths: Frame files in playback order
+        output_file: .gif for an animation, anything else (.png) for a
+            contact sheet with the frames tiled left to right, top to bottom
+        fps: Frame rate of the GIF
+        columns: Contact sheet columns (default: about square)
+        report: Stream for progress and error messages (default: stdout)
+
+    Returns:
+        True if the preview was written
+    """
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        print("❌ Error: ffmpeg is not installed or not in PATH", file=report)
+        return False
+    if not frame_paths:
+        print("❌ Error: No frames to preview", file=report)
+        return False
+
+    if str(output_file).lower().endswith('.gif'):
+        # A palette computed from the frames keeps GIF colors close to the render
+        options = [
+            '-vf', 'split[a][b];[a]palettegen=stats_mode=diff[p];[b][p]paletteuse=dither=bayer',
+            '-loop', '0',
+        ]
+    else:
+        columns = columns or math.ceil(math.sqrt(len(frame_paths)))
+        rows = math.ceil(len(frame_paths) / columns)
+        options = ['-vf', f"tile={columns}x{rows}:padding=4:margin=4", '-frames:v', '1', '-update', '1']
+
+    data = b"".join(Path(path).read_bytes() for path in frame_paths)
+    cmd = [
+        ffmpeg,
+        '-f', 'image2pipe',
+        '-framerate', str(fps),
+        '-c:v', 'png',
+        '-i', '-',
+        *options,
+        '-y',  # Overwrite output file
+        str(output_file)
+    ]
+    result = subprocess.run(cmd, input=data, capture_output=True)
+    if result.returncode != 0:
+        print(f"❌ Error during preview:", file=report)
+        print(result.stderr.decode('utf-8', 'replace')[-2000:], file=report)
+        return False
+
+    print(f"✅ Preview created successfully: {output_file}", file=report)
+    return True
+
+
+def benchmark(frames, size, segment_counts):
+    """Encode generated test frames with each segment count and compare"""
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        print("❌ Error: ffmpeg is not installed or not in PATH")
+        return False
+
+    workdir = tempfile.mkdtemp(prefix="mp4_bench_")
+    try:
+        frames_dir = os.path.join(workdir, "frames")
+        os.makedirs(frames_dir)
+        subprocess.run(
+            [ffmpeg, '-f', 'lavfi', '-i', f"testsrc2=size={size}:rate=24", '-frames:v', str(frames),
+             os.path.join(frames_dir, "frame_%04d.png")],
+            capture_output=True, check=True,
+        )
+        print(f"🎞️  {frames} frames at {size} on {os.cpu_count()} CPUs")
+        print(f"{'segments':>9} {'seconds':>9} {'frames/s':>9} {'speedup':>8}")
+
+        baseline = None
+        for segments in segment_counts:
+            output = os.path.join(workdir, f"out_{segments}.mp4")
+            start = time.perf_counter()
+            devnull = open(os.devnull, 'w')
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                ok = convert_images_to_mp4(frames_dir, output, segments=segments)
+            finally:
+                sys.stdout = stdout
+                devnull.close()
+            elapsed = time.perf_counter() - start
+            if not ok:
+                print(f"{segments:>9} failed")
+                continue
+            baseline = baseline or elapsed
+            print(f"{segments:>9} {elapsed:>9.2f} {frames / elapsed:>9.1f} {baseline / elapsed:>7.2f}x")
+        return True
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def option(name, default):
+    """Value following a command-line flag"""
+    if name in sys.argv[:-1]:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+
 if __name__ == "__main__":
+    if "--watch" in sys.argv:
+        folder, output_file = sys.argv[sys.argv.index("--watch") + 1:sys.argv.index("--watch") + 3]
+        first, _, last = option("--frames", "1-250").partition("-")
+        prefix = option("--prefix", "frame_")
+        paths = [os.path.join(folder, f"{prefix}{n:04d}.png") for n in range(int(first), int(last or first) + 1)]
+        success = encode_while_rendering(paths, output_file, fps=int(option("--fps", 24)), timeout=300)
+        sys.exit(0 if success else 1)
+
+    if "--benchmark" in sys.argv:
+        success = benchmark(
+            int(option("--frames", 240)),
+            option("--size", "1280x720"),
+            [int(n) for n in option("--segments", "1,2,4").split(",")],
+        )
+        sys.exit(0 if success else 1)
+
     if len(sys.argv) < 3:
-        print("Usage: python convert_to_mp4.py <input_folder> <output_file.mp4>")
+        print("Usage: python convert_to_mp4.py <input_folder> <output_file.mp4> [--fps 24] [--segments 1]")
         print("\nExample:")
         print("  python convert_to_mp4.py C:/tmp/umbrella C:/Users/aswin/Videos/umbrella.mp4")
         sys.exit(1)
-    
+
     input_folder = sys.argv[1]
     output_file = sys.argv[2]
-    
+
     if not os.path.exists(input_folder):
         print(f"❌ Error: Input folder does not exist: {input_folder}")
         sys.exit(1)
-    
-    success = convert_images_to_mp4(input_folder, output_file)
+
+    success = convert_images_to_mp4(
+        input_folder, output_file, fps=int(option("--fps", 24)), segments=int(option("--segments", 1))
+    )
     sys.exit(0 if success else 1)
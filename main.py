@@ -76,8 +76,12 @@ async def main():
                 
                 # Send to agent
                 print("\n🤖 Agent: ", end="", flush=True)
-                response = await agent.chat(user_input)
-                print(response)
+                await agent.chat(
+                    user_input,
+                    stream=True,
+                    on_text=lambda text: print(text, end="", flush=True)
+                )
+                print()
                 
             except KeyboardInterrupt:
                 print("\n\n👋 Session interrupted. Goodbye!")
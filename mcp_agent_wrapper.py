@@ -1,20 +1,170 @@
 """
 MCP Agent Wrapper - Connects OpenAI Agent with Blender MCP Server
 """
+import os
+import re
 import sys
 import asyncio
+import hashlib
 import json
+from collections import Counter, OrderedDict
 from typing import Any, Dict, List
 from mcp.client.session import ClientSession
+from mcp.client.sse import sse_client
 from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
 from openai import AsyncOpenAI
 from tool_definitions import BLENDER_TOOLS
 
+# Tools that only read state; they may run alongside each other
+READ_ONLY_TOOLS = {"render_status", "get_scene_state", "get_queue_stats"}
+
+# Marks the system message that stands in for compacted history
+COMPACTION_NOTE = "[Earlier conversation compacted]"
+
+# Tool messages are text-only, so images returned by tools (render_frame)
+# follow the tool results as a user message starting with this note
+IMAGE_NOTE = "[Images returned by tools]"
+
+# Rough cost of one attached image (a 512x512 image at high detail)
+IMAGE_TOKENS = 765
+
+# Tools that affect the whole scene or the active object; they run alone
+SCENE_WIDE_TOOLS = {
+    "clear_scene", "save_file", "execute_batch", "setup_2d_camera",
+    "set_animation_range", "set_render_settings", "render_animation", "render_preview", "render_frame",
+    "cancel_render", "set_background_color", "purge_unused_materials",
+    "create_grease_pencil", "add_gp_stroke", "add_gp_strokes", "set_gp_material",
+}
+
+
+def tool_targets(name: str, arguments: Dict[str, Any]):
+    """Names of the objects a tool call touches, or None if it affects the whole scene"""
+    if name in READ_ONLY_TOOLS:
+        return set()
+    if name in SCENE_WIDE_TOOLS:
+        return None
+    if name == "assign_materials":
+        return {item.get("object_name") for item in arguments.get("assignments", [])}
+    if "object_names" in arguments:
+        return set(arguments["object_names"])
+    for key in ("object_name", "name", "source_object"):
+        if key in arguments:
+            return {arguments[key]}
+    return None
+
+
+def calls_conflict(a, b) -> bool:
+    """Whether two (name, targets) tool calls must keep their relative order"""
+    (name_a, targets_a), (name_b, targets_b) = a, b
+    a_reads, b_reads = name_a in READ_ONLY_TOOLS, name_b in READ_ONLY_TOOLS
+    if a_reads and b_reads:
+        return False
+    if a_reads or b_reads or targets_a is None or targets_b is None:
+        return True
+    return bool(targets_a & targets_b)
+
+
+def is_user_turn(message: Dict) -> bool:
+    """Whether a history message is something the user typed (not attached tool images)"""
+    return message["role"] == "user" and isinstance(message["content"], str)
+
+
+def tool_failed(result: str) -> bool:
+    """Whether a tool result reports a failure, including partly failed execute_batch calls"""
+    if result.startswith("Error"):
+        return True
+    if result.startswith("{"):
+        try:
+            return json.loads(result).get("failed", 0) > 0
+        except (ValueError, AttributeError, TypeError):
+            pass
+    return False
+
+
+def normalize_prompt(message: str) -> str:
+    """Case-, whitespace- and trailing-punctuation-insensitive form of a user message"""
+    return re.sub(r"\s+", " ", message).strip().rstrip(".!?").lower()
+
+
+class PlanCache:
+    """Content-addressed cache of tool-call plans, LRU-bounded and persisted as JSON
+    
+    An entry maps a request key to the rounds of tool calls the model made
+    for it and its final answer, so a repeated prompt on an identical scene
+    can be replayed against Blender without calling OpenAI.
+    
+    Args:
+        path: JSON file to load from and save to (None keeps it in memory)
+        max_entries: Least recently used entries beyond this are evicted
+    """
+    
+    def __init__(self, path: str = None, max_entries: int = 256):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.entries = OrderedDict(json.load(f).get("entries", []))
+            except (OSError, ValueError):
+                pass  # A corrupt cache is just an empty one
+    
+    @staticmethod
+    def key(model: str, system_prompt: str, message: str, scene_digest: str) -> str:
+        """Hash identifying one request against one scene state"""
+        parts = [model, hashlib.sha256(system_prompt.encode()).hexdigest(), normalize_prompt(message), scene_digest]
+        return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+    
+    def get(self, key: str):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        self.save()
+        return entry
+    
+    def put(self, key: str, rounds: List, response: str):
+        self.entries[key] = {"rounds": rounds, "response": response}
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self.save()
+    
+    def evict(self, key: str):
+        if self.entries.pop(key, None) is not None:
+            self.save()
+    
+    def save(self):
+        if not self.path:
+            return
+        temp = self.path + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump({"entries": list(self.entries.items())}, f)
+        os.replace(temp, self.path)
+
 
 class BlenderServer:
-    """Configuration for Blender MCP server"""
+    """Configuration for Blender MCP server
+    
+    Set BLENDER_MCP_POOL=1 to lease a warm Blender from a running pool daemon
+    (python blender_mcp_launcher.py --pool-daemon) instead of starting one.
+    Set BLENDER_MCP_METRICS to a file path (or "stderr") to record per-tool
+    timings, sampled at BLENDER_MCP_METRICS_SAMPLE.
+    Set BLENDER_MCP_URL to join a shared multi-session Blender host instead
+    (http://127.0.0.1:8000/mcp, or .../sse for the SSE transport).
+    """
     command = sys.executable
-    args = ["blender_mcp_launcher.py"]
+    args = ["blender_mcp_launcher.py"] + (["--pool"] if os.getenv("BLENDER_MCP_POOL") else [])
+    if os.getenv("BLENDER_MCP_METRICS"):
+        args += [
+            "--metrics", os.getenv("BLENDER_MCP_METRICS"),
+            "--metrics-sample", os.getenv("BLENDER_MCP_METRICS_SAMPLE", "1"),
+        ]
     env = None
     cwd = None
     encoding = "utf-8"
@@ -24,11 +174,29 @@ class BlenderServer:
 class BlenderMCPAgent:
     """Agentic AI wrapper for Blender MCP tools"""
     
-    def __init__(self, api_key: str, model: str = "gpt-4o"):
+    def __init__(self, api_key: str, model: str = "gpt-4o", max_history_tokens: int = 12000, keep_recent_turns: int = 2,
+                 plan_cache: PlanCache = None):
         self.client = AsyncOpenAI(api_key=api_key)
         self.model = model
         self.mcp_session = None
         self.conversation_history = []
+        self.pending_images = []  # (tool name, data URL) waiting for attach_images()
+        self.turn_rounds = []  # Tool calls of the current chat() turn, for the plan cache
+        
+        # Replays tool plans for repeated prompts; BLENDER_MCP_PLAN_CACHE
+        # names a JSON file to enable it without passing one in
+        if plan_cache is None and os.getenv("BLENDER_MCP_PLAN_CACHE"):
+            plan_cache = PlanCache(os.getenv("BLENDER_MCP_PLAN_CACHE"))
+        self.plan_cache = plan_cache
+        
+        # History compaction: keep requests under max_history_tokens by
+        # replacing old tool traffic with a scene digest from Blender
+        self.max_history_tokens = max_history_tokens
+        self.keep_recent_turns = keep_recent_turns
+        # The tool schemas go out with every request and count toward the budget
+        self.tools_tokens = self.estimate_tokens(BLENDER_TOOLS)
+        self.elided_tool_calls = Counter()
+        self.compaction_stats = []
         
         # System prompt for the agent
         self.system_prompt = """You are a professional 2D animation assistant using Blender.
@@ -54,25 +222,23 @@ When creating animations:
 8. Add lighting with add_light() for better visibility in renders
 9. Save the file with save_file()
 
+To save time, prefer execute_batch() to run all of these steps in a single call. Give creation steps an "id" and refer to the created object as "$id" in later steps.
+
 For rendering to MP4 video:
 1. After creating the animation, call set_render_settings() with format='MP4'
 2. Specify a full path with .mp4 extension (e.g., 'C:/Users/Username/Videos/animation.mp4')
-3. Then call render_animation() to start the render
-4. The video will be saved automatically to the specified path
+3. Then call render_animation() to start the render - it runs in the background and returns a job id
+4. The video will be saved automatically to the specified path; use render_status() to check progress
+
+To check an animation before the full render, call render_preview() - it renders a few low-resolution frames with a fast engine and returns the path of a GIF (or a contact sheet with format='SHEET') in a fraction of the time.
+To look at a single frame yourself, call render_frame() - the image is attached after the tool results.
 
 For bouncing ball animations:
 - Start ball high (y = 2 to 4)
 - Platform at y = -2 to -3
-- Use keyframes to create bounce motion (ball should reach platform level minus ball radius)
+- Use generate_bounce_animation() with the platform's top as floor - it computes realistic bounces with squash and stretch for one or many balls in a single call; don't write bounce keyframes by hand
 - Typical animation: 48 frames at 24fps = 2 seconds
 
-Example keyframes for bouncing ball at [0, 3, 0]:
-- Frame 1: [0, 3, 0] (start)
-- Frame 12: [0, -1.5, 0] (hit platform)
-- Frame 24: [0, 2, 0] (bounce up)
-- Frame 36: [0, -1.5, 0] (second bounce)
-- Frame 48: [0, 1, 0] (smaller bounce)
-
 Common render settings:
 - Resolution: 1920x1080 for Full HD, 1280x720 for HD
 - FPS: 24 for cinematic, 30 for smooth video
@@ -83,8 +249,13 @@ Always provide clear feedback about what you're doing and inform the user when r
     
     async def __aenter__(self):
         """Initialize MCP connection"""
-        self.stdio_context = stdio_client(BlenderServer)
-        self.read, self.write = await self.stdio_context.__aenter__()
+        url = os.getenv("BLENDER_MCP_URL")
+        if url:
+            # Shared Blender host; this session gets its own scene there
+            self.stdio_context = sse_client(url) if url.rstrip("/").endswith("/sse") else streamablehttp_client(url)
+        else:
+            self.stdio_context = stdio_client(BlenderServer)
+        self.read, self.write, *_ = await self.stdio_context.__aenter__()
         
         self.session_context = ClientSession(self.read, self.write)
         self.mcp_session = await self.session_context.__aenter__()
@@ -106,50 +277,351 @@ Always provide clear feedback about what you're doing and inform the user when r
         try:
             result = await self.mcp_session.call_tool(tool_name, arguments=arguments)
             
-            # Extract text from result
+            # Extract text from result; images (render_frame) are held
+            # back for attach_images(), since tool messages are text-only
             if hasattr(result, 'content') and len(result.content) > 0:
-                return result.content[0].text
+                texts = []
+                for item in result.content:
+                    if item.type == "image":
+                        self.pending_images.append((tool_name, f"data:{item.mimeType};base64,{item.data}"))
+                        texts.append(f"[{item.mimeType} image attached below]")
+                    else:
+                        texts.append(item.text)
+                return "\n".join(texts)
             return str(result)
             
         except Exception as e:
             return f"Error calling {tool_name}: {str(e)}"
     
-    async def process_tool_calls(self, tool_calls: List) -> List[Dict]:
-        """Process OpenAI tool calls and execute them via MCP"""
-        results = []
+    def add_round(self, tool_calls: List[Dict], results: List[Dict], content: str = None):
+        """Record one round of tool calls and their results in the history
         
-        for tool_call in tool_calls:
-            function_name = tool_call.function.name
-            arguments = json.loads(tool_call.function.arguments)
-            
-            print(f"🔧 Calling: {function_name}({json.dumps(arguments, indent=2)})")
+        The round is also kept in turn_rounds, since compaction may rewrite
+        the history before the turn ends and record_plan() runs.
+        """
+        self.conversation_history.append({"role": "assistant", "content": content, "tool_calls": tool_calls})
+        self.conversation_history.extend(results)
+        self.attach_images()
+        self.turn_rounds.append((tool_calls, results))
+    
+    def attach_images(self):
+        """Add images returned by this round's tool calls to the history as a user message"""
+        if not self.pending_images:
+            return
+        content = [{"type": "text", "text": f"{IMAGE_NOTE} " + ", ".join(name for name, _ in self.pending_images)}]
+        content += [{"type": "image_url", "image_url": {"url": url}} for _, url in self.pending_images]
+        self.conversation_history.append({"role": "user", "content": content})
+        self.pending_images = []
+    
+    def schedule_tool_call(self, scheduled: List, tool_call_id: str, function_name: str, arguments: Dict[str, Any]):
+        """Start a tool call as soon as every earlier conflicting call has finished
+        
+        Calls on different objects run concurrently over the MCP session;
+        calls touching the same object, or the whole scene, keep their order.
+        
+        Args:
+            scheduled: (name, targets, task) of calls already scheduled this turn;
+                the new call is appended
+        
+        Returns:
+            Task resolving to the tool result message
+        """
+        call = (function_name, tool_targets(function_name, arguments))
+        waits_for = [task for name, targets, task in scheduled if calls_conflict((name, targets), call)]
+        
+        async def run():
+            if waits_for:
+                await asyncio.gather(*waits_for)
             
             # Execute the tool via MCP
             result = await self.call_blender_tool(function_name, arguments)
+            print(f"🔧 Calling: {function_name}({json.dumps(arguments, indent=2)})")
             print(f"   ✓ {result}\n")
             
-            results.append({
-                "tool_call_id": tool_call.id,
+            return {
+                "tool_call_id": tool_call_id,
                 "role": "tool",
                 "name": function_name,
                 "content": result
-            })
+            }
+        
+        task = asyncio.ensure_future(run())
+        scheduled.append((*call, task))
+        return task
+    
+    async def process_tool_calls(self, tool_calls: List) -> List[Dict]:
+        """Process OpenAI tool calls and execute them via MCP
         
-        return results
+        Independent calls run concurrently; results come back in the
+        order the model issued the calls.
+        """
+        scheduled = []
+        tasks = [
+            self.schedule_tool_call(
+                scheduled, tool_call.id, tool_call.function.name, json.loads(tool_call.function.arguments)
+            )
+            for tool_call in tool_calls
+        ]
+        return list(await asyncio.gather(*tasks))
     
-    async def chat(self, user_message: str) -> str:
-        """Send a message to the agent and get a response"""
+    @staticmethod
+    def estimate_tokens(messages: List[Dict]) -> int:
+        """Rough token count (about 4 characters per token, IMAGE_TOKENS per image)"""
+        characters = images = 0
+        for message in messages:
+            content = message.get("content")
+            if isinstance(content, list):
+                # Base64 image data is not billed by length
+                images += sum(part["type"] == "image_url" for part in content)
+                message = {**message, "content": [part for part in content if part["type"] != "image_url"]}
+            characters += len(json.dumps(message, default=str))
+        return characters // 4 + images * IMAGE_TOKENS
+    
+    async def scene_digest(self) -> str:
+        """Compact description of the current Blender scene"""
+        digest = await self.call_blender_tool("get_scene_state", {})
+        return digest if len(digest) <= 4000 else digest[:4000] + " ...(truncated)"
+    
+    async def compact_history(self):
+        """Shrink conversation_history when the request would exceed max_history_tokens
+        
+        Tool calls and results from all but the last keep_recent_turns user
+        turns are replaced by one note with a tally of the elided calls and
+        the current scene state. The turn in progress is always kept whole,
+        so keep_recent_turns=0 behaves like 1. User messages and final
+        answers stay until the budget forces the oldest ones out; as a last
+        resort long tool results are truncated. History
+        is left alone when none of this makes the request smaller.
+        """
+        # System prompt and tool schemas are part of every request
+        system = [{"role": "system", "content": self.system_prompt}]
+        def request_tokens(messages):
+            return self.estimate_tokens(system + messages) + self.tools_tokens
+        
+        before = request_tokens(self.conversation_history)
+        if before <= self.max_history_tokens:
+            return
+        
+        notes = [m for m in self.conversation_history if str(m.get("content", "")).startswith(COMPACTION_NOTE)]
+        history = [m for m in self.conversation_history if m not in notes]
+        user_turns = [i for i, m in enumerate(history) if is_user_turn(m)]
+        keep = max(self.keep_recent_turns, 1)
+        split = user_turns[-keep] if len(user_turns) >= keep else 0
+        old, recent = history[:split], history[split:]
+        
+        # Keep the dialogue of old turns, drop their tool traffic
+        kept, elided, elidable = [], Counter(), False
+        for message in old:
+            if message["role"] == "tool" or (message["role"] == "user" and not is_user_turn(message)):
+                elidable = True
+                continue  # Tool results and the images they returned
+            for tool_call in message.get("tool_calls") or []:
+                elided[tool_call["function"]["name"]] += 1
+                elidable = True
+            if message["role"] == "user" or message.get("content"):
+                kept.append({"role": message["role"], "content": message.get("content")})
+        
+        # Fetch a scene digest (up to ~4000 characters plus the note) only
+        # when replacing the old tool traffic with it makes the request smaller
+        if elidable and request_tokens(kept + recent) + 1100 < before:
+            digest = await self.scene_digest()
+            tally = ", ".join(f"{name} x{count}" for name, count in (self.elided_tool_calls + elided).most_common())
+            note = [{
+                "role": "system",
+                "content": f"{COMPACTION_NOTE} Earlier tool calls were removed to save space ({tally or 'none'}). "
+                           f"Current Blender scene state: {digest}",
+            }]
+            compacted = note + kept + recent
+            
+            # Still too big: drop the oldest kept dialogue
+            while kept and request_tokens(compacted) > self.max_history_tokens:
+                kept.pop(0)
+                compacted = note + kept + recent
+        else:
+            note, kept, elided = notes[-1:], old, Counter()
+            compacted = note + kept + recent
+        
+        # Last resort: truncate long tool results
+        if request_tokens(compacted) > self.max_history_tokens:
+            compacted = note + [
+                {**message, "content": message["content"][:500] + " ...(truncated)"}
+                if message["role"] == "tool" and len(message["content"]) > 500 else message
+                for message in kept + recent
+            ]
+        
+        after = request_tokens(compacted)
+        if after >= before:
+            return  # The scene digest would cost more than it saves
+        
+        self.conversation_history = compacted
+        self.elided_tool_calls += elided
+        self.compaction_stats.append({
+            "turn": len([m for m in compacted if is_user_turn(m)]),
+            "tokens_before": before,
+            "tokens_after": after,
+            "tokens_saved": before - after,
+        })
+        print(f"🗜️  Compacted history: {before} → {after} tokens (saved {before - after})\n")
+    
+    async def build_messages(self) -> List[Dict]:
+        """System prompt plus (compacted) conversation history"""
+        await self.compact_history()
+        return [
+            {"role": "system", "content": self.system_prompt}
+        ] + self.conversation_history
+    
+    async def stream_completion(self, messages: List[Dict], on_text=None):
+        """Stream one model response, starting each tool call as soon as its arguments are complete
+        
+        A call's arguments are complete once the stream moves on to the next
+        call index (or ends), so Blender starts working while the model is
+        still writing the rest of the turn.
+        
+        Args:
+            messages: Request messages
+            on_text: Optional callback(str) for each piece of assistant text
+        
+        Returns:
+            (content, tool_calls, tasks): assistant text, tool calls in
+            history format and the tasks resolving to their results
+        """
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            tools=BLENDER_TOOLS,
+            tool_choice="auto",
+            stream=True
+        )
+        
+        content = []
+        tool_calls = []
+        tasks = []
+        scheduled = []
+        
+        def dispatch(tool_call):
+            function = tool_call["function"]
+            tasks.append(self.schedule_tool_call(
+                scheduled, tool_call["id"], function["name"], json.loads(function["arguments"] or "{}")
+            ))
+        
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            
+            if delta.content:
+                content.append(delta.content)
+                if on_text:
+                    on_text(delta.content)
+            
+            for part in delta.tool_calls or []:
+                if part.index >= len(tool_calls):
+                    # A new call started, so the previous one is complete
+                    if tool_calls:
+                        dispatch(tool_calls[-1])
+                    tool_calls.append({"id": "", "type": "function", "function": {"name": "", "arguments": ""}})
+                tool_call = tool_calls[part.index]
+                if part.id:
+                    tool_call["id"] = part.id
+                if part.function and part.function.name:
+                    tool_call["function"]["name"] += part.function.name
+                if part.function and part.function.arguments:
+                    tool_call["function"]["arguments"] += part.function.arguments
+        
+        if tool_calls:
+            dispatch(tool_calls[-1])
+        
+        return "".join(content) or None, tool_calls, tasks
+    
+    async def plan_cache_key(self, user_message: str) -> str:
+        """PlanCache key for user_message against the current scene, or None if the scene can't be read"""
+        try:
+            state = json.loads(await self.call_blender_tool("get_scene_state", {}))
+        except ValueError:
+            return None
+        # The revision token differs per session even for identical scenes
+        state.pop("revision", None)
+        state.pop("full", None)
+        digest = hashlib.sha256(json.dumps(state, sort_keys=True).encode()).hexdigest()
+        return PlanCache.key(self.model, self.system_prompt, user_message, digest)
+    
+    async def replay_plan(self, entry: Dict) -> bool:
+        """Run a cached plan against Blender, recording it in the history as if the model had
+        
+        Returns:
+            False if a replayed call failed (the results are still in history)
+        """
+        for number, calls in enumerate(entry["rounds"]):
+            tool_calls = [
+                {"id": f"cached_{number}_{index}", "type": "function", "function": call}
+                for index, call in enumerate(calls)
+            ]
+            scheduled = []
+            tasks = [
+                self.schedule_tool_call(scheduled, tc["id"], tc["function"]["name"], json.loads(tc["function"]["arguments"]))
+                for tc in tool_calls
+            ]
+            results = list(await asyncio.gather(*tasks))
+            self.add_round(tool_calls, results)
+            if any(tool_failed(result["content"]) for result in results):
+                return False
+        return True
+    
+    def record_plan(self, key: str, response: str):
+        """Store the tool calls of the turn that just finished, unless one of them failed"""
+        if any(tool_failed(result["content"]) for _, results in self.turn_rounds for result in results):
+            return
+        rounds = [
+            [{"name": tc["function"]["name"], "arguments": tc["function"]["arguments"]} for tc in tool_calls]
+            for tool_calls, _ in self.turn_rounds
+        ]
+        self.plan_cache.put(key, rounds, response)
+    
+    async def chat(self, user_message: str, stream: bool = False, on_text=None) -> str:
+        """Send a message to the agent and get a response
+        
+        Args:
+            user_message: The user's request
+            stream: Stream the response, running tool calls while the model
+                is still generating
+            on_text: Optional callback(str) receiving assistant text as it
+                streams (only with stream=True)
+        """
+        cache_key = await self.plan_cache_key(user_message) if self.plan_cache else None
+        self.turn_rounds = []
+        
         # Add user message to history
         self.conversation_history.append({
             "role": "user",
             "content": user_message
         })
         
+        entry = self.plan_cache.get(cache_key) if cache_key else None
+        if entry:
+            print(f"♻️  Replaying cached plan ({sum(len(calls) for calls in entry['rounds'])} tool calls)\n")
+            if await self.replay_plan(entry):
+                self.conversation_history.append({"role": "assistant", "content": entry["response"]})
+                if stream and on_text and entry["response"]:
+                    on_text(entry["response"])
+                return entry["response"]
+            # The scene no longer behaves as recorded; let the model take over from here
+            self.plan_cache.evict(cache_key)
+            cache_key = None
+        
         # Prepare messages with system prompt
-        messages = [
-            {"role": "system", "content": self.system_prompt}
-        ] + self.conversation_history
+        messages = await self.build_messages()
+        
+        if stream:
+            response = await self.chat_streaming(messages, on_text)
+        else:
+            response = await self.chat_blocking(messages)
         
+        if cache_key:
+            self.record_plan(cache_key, response)
+        return response
+    
+    async def chat_blocking(self, messages: List[Dict]) -> str:
+        """Tool loop of chat() for stream=False"""
         # Call OpenAI with tools
         response = await self.client.chat.completions.create(
             model=self.model,
@@ -162,33 +634,26 @@ Always provide clear feedback about what you're doing and inform the user when r
         
         # Handle tool calls
         while assistant_message.tool_calls:
-            # Add assistant message with tool calls to history
-            self.conversation_history.append({
-                "role": "assistant",
-                "content": assistant_message.content,
-                "tool_calls": [
-                    {
-                        "id": tc.id,
-                        "type": "function",
-                        "function": {
-                            "name": tc.function.name,
-                            "arguments": tc.function.arguments
-                        }
+            tool_calls = [
+                {
+                    "id": tc.id,
+                    "type": "function",
+                    "function": {
+                        "name": tc.function.name,
+                        "arguments": tc.function.arguments
                     }
-                    for tc in assistant_message.tool_calls
-                ]
-            })
+                }
+                for tc in assistant_message.tool_calls
+            ]
             
             # Execute tools
             tool_results = await self.process_tool_calls(assistant_message.tool_calls)
             
-            # Add tool results to history
-            self.conversation_history.extend(tool_results)
+            # Add the tool calls and their results to history
+            self.add_round(tool_calls, tool_results, assistant_message.content)
             
             # Get next response
-            messages = [
-                {"role": "system", "content": self.system_prompt}
-            ] + self.conversation_history
+            messages = await self.build_messages()
             
             response = await self.client.chat.completions.create(
                 model=self.model,
@@ -206,3 +671,22 @@ Always provide clear feedback about what you're doing and inform the user when r
         })
         
         return assistant_message.content
+    
+    async def chat_streaming(self, messages: List[Dict], on_text=None) -> str:
+        """Tool loop of chat() for stream=True"""
+        content, tool_calls, tasks = await self.stream_completion(messages, on_text)
+        
+        while tool_calls:
+            # Calls were already dispatched while streaming; collect results in order
+            tool_results = list(await asyncio.gather(*tasks))
+            self.add_round(tool_calls, tool_results, content)
+            
+            messages = await self.build_messages()
+            content, tool_calls, tasks = await self.stream_completion(messages, on_text)
+        
+        self.conversation_history.append({
+            "role": "assistant",
+            "content": content
+        })
+        
+        return content
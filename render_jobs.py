@@ -0,0 +1,294 @@
+"""
+Background render jobs for the Blender MCP server
+Each job renders a saved snapshot of the scene in background Blender
+processes, so the MCP channel stays free while frames are being rendered.
+A job can split its frame range across several worker processes.
+
+Usage: python render_jobs.py --benchmark [--frames 48] [--frame-time 0.05] [--workers 1,2,4,8]
+Runs the farm with a fake renderer and reports the speedup per worker count.
+"""
+import asyncio
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+
+# Blender prints one of these lines for every finished frame
+# (image sequences report the saved file, movies the appended frame)
+FRAME_DONE = re.compile(rb"^\s*(Saved: |Append frame )")
+
+
+def split_frames(frame_start, frame_end, workers):
+    """Split an inclusive frame range into at most `workers` contiguous chunks"""
+    total = frame_end - frame_start + 1
+    workers = max(1, min(workers, total))
+    size, extra = divmod(total, workers)
+    chunks = []
+    start = frame_start
+    for i in range(workers):
+        end = start + size + (1 if i < extra else 0) - 1
+        chunks.append((start, end))
+        start = end + 1
+    return chunks
+
+
+def frame_list_spec(frames):
+    """Blender --render-frame argument for a sorted frame list (e.g. 40..48,52)"""
+    runs = []
+    for frame in frames:
+        if runs and frame == runs[-1][1] + 1:
+            runs[-1][1] = frame
+        else:
+            runs.append([frame, frame])
+    return ",".join(str(a) if a == b else f"{a}..{b}" for a, b in runs)
+
+
+def blender_render_command(blender, blend_file, output, frame_start, frame_end, scene=None, file_format=None, frames=None):
+    """Command line that renders a frame range of blend_file in the background
+    
+    Passing frames (a sorted list) renders exactly those frames instead of
+    the range, writing one image per frame.
+    """
+    command = [blender, "--background", blend_file]
+    if scene:
+        command += ["--scene", scene]
+    if file_format:
+        command += ["--render-format", file_format]
+    command += ["--render-output", output]
+    if frames is not None:
+        command += ["--render-frame", frame_list_spec(frames)]
+    else:
+        command += [
+            "--frame-start", str(frame_start),
+            "--frame-end", str(frame_end),
+            "--render-anim",
+        ]
+    return command
+
+
+class RenderJob:
+    """A render running in one or more background processes, with progress tracking
+
+    Args:
+        commands: One command line per worker process
+        total_frames: Frames rendered across all workers
+        output: Output path reported to the client
+        workdir: Temp folder removed once the job ends
+        finalize: Optional async callable(job) run after all workers succeed;
+            returns an error message or None
+        cached_frames: Frames reused from earlier renders (not in total_frames)
+    """
+
+    def __init__(self, commands, total_frames, output, workdir=None, finalize=None, cached_frames=0):
+        self.id = uuid.uuid4().hex[:8]
+        self.commands = commands
+        self.total_frames = total_frames
+        self.cached_frames = cached_frames
+        self.output = output
+        self.workdir = workdir
+        self.finalize = finalize
+        self.status = "queued"
+        self.frames_done = 0
+        self.frame_times = []
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._listeners = []
+        self._cancel_callbacks = []
+        self._processes = []
+        self._last_frame_at = None
+        self._task = None
+
+    def add_listener(self, callback):
+        """Register an async callback(job) run after each finished frame and at the end"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """Stop calling a callback registered with add_listener"""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+    
+    def add_cancel_callback(self, callback):
+        """Register a callable() run when the job is cancelled, e.g. to stop helper threads"""
+        self._cancel_callbacks.append(callback)
+    
+    def start(self):
+        """Launch the render on the running event loop"""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    async def wait(self):
+        """Wait for the render to finish (without cancelling it if the waiter is)"""
+        await asyncio.shield(self._task)
+        return self
+
+    def cancel(self):
+        """Stop the render process; returns False if the job already finished"""
+        if self.status not in ("queued", "running", "finalizing"):
+            return False
+        self.status = "cancelled"
+        for process in self._processes:
+            if process.returncode is None:
+                process.terminate()
+        for callback in self._cancel_callbacks:
+            callback()
+        return True
+
+    @property
+    def eta(self):
+        """Estimated seconds left, from the average time per frame so far"""
+        if not self.frame_times or self.status != "running":
+            return None
+        average = sum(self.frame_times) / len(self.frame_times)
+        return average * max(self.total_frames - self.frames_done, 0)
+
+    def to_dict(self):
+        """Summary for render_status"""
+        average = sum(self.frame_times) / len(self.frame_times) if self.frame_times else None
+        end = self.finished_at or time.monotonic()
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "frames_done": self.frames_done,
+            "total_frames": self.total_frames,
+            "cached_frames": self.cached_frames,
+            "seconds_per_frame": round(average, 3) if average else None,
+            "last_frame_seconds": round(self.frame_times[-1], 3) if self.frame_times else None,
+            "eta_seconds": round(self.eta, 1) if self.eta is not None else None,
+            "elapsed_seconds": round(end - self.started_at, 1) if self.started_at else None,
+            "workers": len(self.commands),
+            "output": self.output,
+            "error": self.error,
+        }
+
+    async def _notify(self):
+        for callback in self._listeners:
+            try:
+                await callback(self)
+            except Exception:
+                pass  # Progress reporting must never break the render
+
+    async def _run_worker(self, command):
+        """Run one worker process and count the frames it reports"""
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            limit=1 << 20,
+        )
+        self._processes.append(process)
+        if self.status == "cancelled":
+            process.terminate()
+
+        async for line in process.stdout:
+            if FRAME_DONE.match(line):
+                # Time between completions across all workers, so the ETA
+                # reflects the combined throughput of the farm
+                now = time.monotonic()
+                self.frame_times.append(now - self._last_frame_at)
+                self._last_frame_at = now
+                self.frames_done += 1
+                await self._notify()
+            elif line.lstrip().startswith(b"Error"):
+                self.error = line.decode("utf-8", "replace").strip()
+
+        returncode = await process.wait()
+        if returncode != 0 and self.status == "running":
+            # One failed chunk fails the job; stop the other workers
+            self.error = self.error or f"Renderer exited with code {returncode}"
+            self.status = "failed"
+            for other in self._processes:
+                if other.returncode is None:
+                    other.terminate()
+
+    async def _run(self):
+        try:
+            if self.status == "cancelled":
+                return
+            self.status = "running"
+            self.started_at = self._last_frame_at = time.monotonic()
+            await asyncio.gather(*(self._run_worker(command) for command in self.commands))
+
+            if self.status == "running" and self.finalize:
+                self.status = "finalizing"
+                error = await self.finalize(self)
+                if error and self.status == "finalizing":
+                    self.status = "failed"
+                    self.error = error
+            if self.status in ("running", "finalizing"):
+                self.status = "completed"
+        except Exception as e:
+            self.status = "failed"
+            self.error = str(e)
+        finally:
+            self.finished_at = time.monotonic()
+            if self.workdir:
+                shutil.rmtree(self.workdir, ignore_errors=True)
+            await self._notify()
+
+
+# ========== FAKE RENDERER AND BENCHMARK ==========
+
+def fake_render_command(output, frame_start, frame_end, frame_time):
+    """Stand-in for blender_render_command that burns CPU instead of rendering"""
+    return [
+        sys.executable, os.path.abspath(__file__), "--fake-render",
+        output, str(frame_start), str(frame_end), str(frame_time),
+    ]
+
+
+def fake_render(output, frame_start, frame_end, frame_time):
+    """Write an empty PNG per frame after frame_time seconds of busy work"""
+    for frame in range(frame_start, frame_end + 1):
+        deadline = time.perf_counter() + frame_time
+        while time.perf_counter() < deadline:
+            pass
+        path = f"{output}{frame:04d}.png"
+        open(path, "wb").close()
+        print(f"Saved: '{path}'", flush=True)
+
+
+async def benchmark(frames, frame_time, worker_counts):
+    """Render the same fake animation with each worker count and compare"""
+    print(f"🎬 {frames} frames at {frame_time}s/frame on {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'seconds':>9} {'frames/s':>9} {'speedup':>8}")
+
+    baseline = None
+    for workers in worker_counts:
+        outdir = tempfile.mkdtemp(prefix="render_farm_bench_")
+        output = os.path.join(outdir, "frame_")
+        commands = [
+            fake_render_command(output, start, end, frame_time)
+            for start, end in split_frames(1, frames, workers)
+        ]
+        start = time.perf_counter()
+        job = await RenderJob(commands, frames, output, workdir=outdir).start().wait()
+        elapsed = time.perf_counter() - start
+
+        if job.status != "completed":
+            print(f"{workers:>8} failed: {job.error}")
+            continue
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>9.2f} {frames / elapsed:>9.1f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--fake-render":
+        output, frame_start, frame_end, frame_time = sys.argv[2:6]
+        fake_render(output, int(frame_start), int(frame_end), float(frame_time))
+    elif len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        options = {"--frames": "48", "--frame-time": "0.05", "--workers": "1,2,4,8"}
+        for i, arg in enumerate(sys.argv):
+            if arg in options:
+                options[arg] = sys.argv[i + 1]
+        asyncio.run(benchmark(
+            int(options["--frames"]),
+            float(options["--frame-time"]),
+            [int(n) for n in options["--workers"].split(",")],
+        ))
+    else:
+        print(__doc__)
@@ -58,12 +58,71 @@ BLENDER_TOOLS = [
                     "frame": {
                         "type": "integer",
                         "description": "Frame number to add the stroke to (1-based)"
+                    },
+                    "tolerance": {
+                        "type": "number",
+                        "description": "Simplify dense strokes: drop points within this distance of the simplified line (0 keeps every point)",
+                        "default": 0.0
                     }
                 },
                 "required": ["layer_name", "points", "frame"]
             }
         }
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "add_gp_strokes",
+            "description": "Draw many strokes across layers and frames of a Grease Pencil object in one call (much faster than repeated add_gp_stroke; works with Blender 4.3+ Grease Pencil)",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "strokes": {
+                        "type": "array",
+                        "description": "Strokes to draw",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "points": {
+                                    "type": "array",
+                                    "description": "[x, y, z] points of the stroke path",
+                                    "items": {
+                                        "type": "array",
+                                        "items": {"type": "number"},
+                                        "minItems": 3,
+                                        "maxItems": 3
+                                    }
+                                },
+                                "layer": {
+                                    "type": "string",
+                                    "description": "Layer to draw on (default 'Lines')"
+                                },
+                                "frame": {
+                                    "type": "integer",
+                                    "description": "Frame number (default 1)"
+                                },
+                                "radius": {
+                                    "type": "number",
+                                    "description": "Stroke thickness radius (default 0.02)"
+                                }
+                            },
+                            "required": ["points"]
+                        }
+                    },
+                    "object_name": {
+                        "type": "string",
+                        "description": "Grease Pencil object to draw on (defaults to the active object)"
+                    },
+                    "tolerance": {
+                        "type": "number",
+                        "description": "Simplify dense strokes: drop points within this distance of the simplified line (0 keeps every point)",
+                        "default": 0.0
+                    }
+                },
+                "required": ["strokes"]
+            }
+        }
+    },
     {
         "type": "function",
         "function": {
@@ -255,19 +314,151 @@ BLENDER_TOOLS = [
         "type": "function",
         "function": {
             "name": "render_animation",
-            "description": "Start rendering the animation using current render settings (call set_render_settings first to configure output format and path)",
+            "description": "Start rendering the animation in the background using current render settings (call set_render_settings first to configure output format and path). Returns a job id immediately",
             "parameters": {
                 "type": "object",
                 "properties": {
                     "output_path": {
                         "type": "string",
                         "description": "Optional: Override output path. If not provided, uses path from set_render_settings"
+                    },
+                    "wait": {
+                        "type": "boolean",
+                        "description": "Optional: Wait until the render finishes before returning (default false)"
+                    },
+                    "workers": {
+                        "type": "integer",
+                        "description": "Optional: Number of parallel Blender processes to split the frames across (default 1). Use 2-4 for long animations",
+                        "minimum": 1
+                    },
+                    "use_cache": {
+                        "type": "boolean",
+                        "description": "Optional: Reuse frames whose scene content has not changed since they were last rendered to the same output, so an edit to frames 40-48 only re-renders those. Default: on for PNG sequences, off for MP4 (caching MP4 renders frames and encodes them with ffmpeg)"
+                    }
+                },
+                "required": []
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "render_preview",
+            "description": "Quickly render a low-resolution preview of the animation (a subset of frames, fast engine, simplify on) and return the path of a looping GIF or a contact sheet. The scene's render settings are not changed. Use it to check an animation before render_animation",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "output_path": {
+                        "type": "string",
+                        "description": "Optional: Preview file path (default: a file in the temp folder)"
+                    },
+                    "max_frames": {
+                        "type": "integer",
+                        "description": "Optional: Most frames to render; longer animations use every Nth frame (default 16)",
+                        "minimum": 1
+                    },
+                    "resolution_percentage": {
+                        "type": "integer",
+                        "description": "Optional: Percentage of the scene resolution to render at (default 25)",
+                        "minimum": 1,
+                        "maximum": 100
+                    },
+                    "engine": {
+                        "type": "string",
+                        "description": "Optional: WORKBENCH (fastest, solid colors) or EEVEE (low samples, closer to the final look). Default WORKBENCH",
+                        "enum": ["WORKBENCH", "EEVEE"]
+                    },
+                    "format": {
+                        "type": "string",
+                        "description": "Optional: GIF for a looping animation or SHEET for a single PNG with the frames tiled (default GIF)",
+                        "enum": ["GIF", "SHEET"]
+                    },
+                    "workers": {
+                        "type": "integer",
+                        "description": "Optional: Number of parallel Blender processes (default 1)",
+                        "minimum": 1
+                    },
+                    "wait": {
+                        "type": "boolean",
+                        "description": "Optional: Wait for the preview before returning (default true)"
+                    }
+                },
+                "required": []
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "render_frame",
+            "description": "Render a single frame and return it directly as image content (no files left on disk). Use a small max_dimension and JPEG/WEBP to inspect a result quickly",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "frame": {
+                        "type": "integer",
+                        "description": "Optional: Frame to render (default: current frame)"
+                    },
+                    "max_dimension": {
+                        "type": "integer",
+                        "description": "Optional: Longest image side in pixels; the scene resolution is scaled down to fit (default 512)",
+                        "minimum": 1
+                    },
+                    "format": {
+                        "type": "string",
+                        "description": "Optional: Image format (default PNG)",
+                        "enum": ["PNG", "JPEG", "WEBP"]
+                    },
+                    "quality": {
+                        "type": "integer",
+                        "description": "Optional: JPEG/WEBP quality (default 80)",
+                        "minimum": 1,
+                        "maximum": 100
+                    },
+                    "engine": {
+                        "type": "string",
+                        "description": "Optional: Render with a fast engine instead of the scene's (WORKBENCH or EEVEE at low samples)",
+                        "enum": ["WORKBENCH", "EEVEE"]
                     }
                 },
                 "required": []
             }
         }
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "render_status",
+            "description": "Check progress of background render jobs: frames done, time per frame and estimated time left",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "job_id": {
+                        "type": "string",
+                        "description": "Optional: Job id returned by render_animation. Reports all jobs if omitted"
+                    }
+                },
+                "required": []
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "cancel_render",
+            "description": "Stop a running background render job",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "job_id": {
+                        "type": "string",
+                        "description": "Job id returned by render_animation"
+                    }
+                },
+                "required": ["job_id"]
+            }
+        }
+    },
     {
         "type": "function",
         "function": {
@@ -307,6 +498,14 @@ BLENDER_TOOLS = [
                         "items": {"type": "number"},
                         "minItems": 3,
                         "maxItems": 3
+                    },
+                    "vertices": {
+                        "type": "integer",
+                        "description": "Number of vertices around the circle (default 32)"
+                    },
+                    "instance": {
+                        "type": "boolean",
+                        "description": "Share one mesh between all circles with the same radius and vertices. Use for many identical shapes (particles, balls)"
                     }
                 },
                 "required": ["name", "radius", "location"]
@@ -339,12 +538,47 @@ BLENDER_TOOLS = [
                         "items": {"type": "number"},
                         "minItems": 3,
                         "maxItems": 3
+                    },
+                    "instance": {
+                        "type": "boolean",
+                        "description": "Share one mesh between all rectangles. Use for many identical shapes"
                     }
                 },
                 "required": ["name", "width", "height", "location"]
             }
         }
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "create_instances",
+            "description": "Place many copies of an existing object in one call. Copies share the source geometry, so this is cheap even for thousands of objects",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "source_object": {
+                        "type": "string",
+                        "description": "Name of the object to copy"
+                    },
+                    "locations": {
+                        "type": "array",
+                        "description": "Position [x, y, z] of each copy",
+                        "items": {
+                            "type": "array",
+                            "items": {"type": "number"},
+                            "minItems": 3,
+                            "maxItems": 3
+                        }
+                    },
+                    "name_prefix": {
+                        "type": "string",
+                        "description": "Name prefix for the copies, numbered from 0 (defaults to the source name)"
+                    }
+                },
+                "required": ["source_object", "locations"]
+            }
+        }
+    },
     {
         "type": "function",
         "function": {
@@ -375,6 +609,62 @@ BLENDER_TOOLS = [
             }
         }
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "assign_materials",
+            "description": "Color many objects in one call. Objects with the same color share one material",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "assignments": {
+                        "type": "array",
+                        "description": "One entry per object to color",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "object_name": {
+                                    "type": "string",
+                                    "description": "Name of the object"
+                                },
+                                "color": {
+                                    "type": "array",
+                                    "description": "RGB color values in 0-1 range [r, g, b]",
+                                    "items": {"type": "number", "minimum": 0, "maximum": 1},
+                                    "minItems": 3,
+                                    "maxItems": 3
+                                },
+                                "alpha": {
+                                    "type": "number",
+                                    "description": "Transparency: 0.0 = fully transparent, 1.0 = fully opaque",
+                                    "minimum": 0,
+                                    "maximum": 1
+                                }
+                            },
+                            "required": ["object_name", "color"]
+                        }
+                    },
+                    "purge_orphans": {
+                        "type": "boolean",
+                        "description": "Delete materials that end up unused (default false)"
+                    }
+                },
+                "required": ["assignments"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "purge_unused_materials",
+            "description": "Delete materials that are no longer assigned to any object",
+            "parameters": {
+                "type": "object",
+                "properties": {},
+                "required": []
+            }
+        }
+    },
     {
         "type": "function",
         "function": {
@@ -396,11 +686,141 @@ BLENDER_TOOLS = [
                             "minItems": 4,
                             "maxItems": 4
                         }
+                    },
+                    "tolerance": {
+                        "type": "number",
+                        "description": "Simplify dense per-frame paths: drop keys the others reproduce within this distance (0 keeps every key)",
+                        "default": 0.0
                     }
                 },
                 "required": ["object_name", "keyframes"]
             }
         }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "generate_bounce_animation",
+            "description": "Make objects fall from their current position and bounce on a floor with real physics, including squash and stretch (RECOMMENDED for bouncing balls; handles many objects in one call)",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "object_names": {
+                        "type": "array",
+                        "description": "Objects to animate; each drops from its current y position",
+                        "items": {"type": "string"}
+                    },
+                    "start_frame": {
+                        "type": "integer",
+                        "description": "Frame the drop starts",
+                        "default": 1
+                    },
+                    "end_frame": {
+                        "type": "integer",
+                        "description": "Last animated frame (defaults to the scene end frame)"
+                    },
+                    "floor": {
+                        "type": "number",
+                        "description": "Height of the floor surface the objects land on",
+                        "default": -2.0
+                    },
+                    "gravity": {
+                        "type": "number",
+                        "description": "Downward acceleration in units per second squared",
+                        "default": 9.81
+                    },
+                    "restitution": {
+                        "type": "number",
+                        "description": "Fraction of speed kept at each bounce (0-1); higher bounces longer",
+                        "default": 0.7
+                    },
+                    "horizontal_speed": {
+                        "type": "number",
+                        "description": "Sideways speed along x in units per second",
+                        "default": 0.0
+                    },
+                    "squash": {
+                        "type": "number",
+                        "description": "How much objects flatten on impact (0 disables)",
+                        "default": 0.3
+                    },
+                    "stretch": {
+                        "type": "number",
+                        "description": "How much objects stretch while moving fast (0 disables)",
+                        "default": 0.15
+                    }
+                },
+                "required": ["object_names"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_scene_state",
+            "description": "Describe the Blender scene: objects with type, transforms, material, keyframe count and animation range (columnar lists indexing 'types' and 'materials' tables), plus frame range, fps and camera. Returns a revision token; pass it back as 'since' to get only what changed",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "since": {
+                        "type": "string",
+                        "description": "Revision token from a previous get_scene_state call. Returns only changed objects and the names of removed ones"
+                    }
+                },
+                "required": []
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_queue_stats",
+            "description": "Report the Blender server's work queue: current and peak depth, wait time percentiles in ms, burst sizes and busy time",
+            "parameters": {
+                "type": "object",
+                "properties": {},
+                "required": []
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "execute_batch",
+            "description": "Run many Blender tools in order in a single call (RECOMMENDED for building a whole scene at once). Returns per-operation results",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "operations": {
+                        "type": "array",
+                        "description": "Ordered operations. Give an op an 'id' to reference the object it creates from later ops as \"$id\", e.g. {\"id\": \"ball\", \"tool\": \"create_2d_circle\", \"args\": {...}} then {\"tool\": \"set_object_material\", \"args\": {\"object_name\": \"$ball\", ...}}",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "id": {
+                                    "type": "string",
+                                    "description": "Optional label used to reference this operation's created object"
+                                },
+                                "tool": {
+                                    "type": "string",
+                                    "description": "Name of any other Blender tool (e.g., 'create_2d_circle')"
+                                },
+                                "args": {
+                                    "type": "object",
+                                    "description": "Arguments for the tool, same as when calling it directly"
+                                }
+                            },
+                            "required": ["tool", "args"]
+                        }
+                    },
+                    "stop_on_error": {
+                        "type": "boolean",
+                        "description": "Skip remaining operations after the first failure (default true)"
+                    }
+                },
+                "required": ["operations"]
+            }
+        }
     }
 ]
 